@@ -2,7 +2,7 @@
 🚀 TELCO CHURN ELT - DAG Airflow
 ==================================
 
-Pipeline ELT orchestré par Apache Airflow.
+Pipeline ELT orchestré par Apache Airflow (TaskFlow API).
 
 Architecture:
     MinIO S3 (Bronze) → Extract → Transform → Load (Silver/Gold + PostgreSQL) → Grafana
@@ -13,217 +13,239 @@ Tasks:
     3. clean_csv           : Nettoyage des données CSV
     4. clean_json          : Nettoyage des données JSON
     5. load_silver         : Chargement Silver (Parquet) dans MinIO
-    6. feature_engineering : Feature engineering + insights
-    7. load_gold           : Chargement Gold (Parquet) dans MinIO
-    8. load_warehouse      : Chargement dans PostgreSQL (staging + dimensions + facts + insights + features)
+    6. feat_csv / feat_json: Feature engineering + insights (pool "feature_eng")
+    7. dims_csv / dims_json: Dimensions (pool "feature_eng")
+    8. facts_csv/facts_json: Tables de faits (pool "feature_eng")
+    9. load_gold           : Chargement Gold (Parquet) dans MinIO
+    10. load_warehouse     : Chargement dans PostgreSQL (staging + dimensions + facts + insights + features)
+
+Échange de données entre tasks:
+    Les DataFrames retournés par les tasks sont persistés en Arrow IPC par
+    src.utils.xcom_backend.ArrowXComBackend; les tasks en aval reçoivent des
+    tables Arrow memory-mappées et ne les convertissent en pandas que si besoin.
 """
 
-import sys
 import os
+import sys
 from datetime import datetime, timedelta
+from functools import partial
 
 from airflow import DAG
-from airflow.operators.python import PythonOperator
+from airflow.decorators import task
 
 # Ajouter src au path pour les imports
 sys.path.insert(0, "/opt/airflow")
 
+# Pool Airflow des tasks de feature engineering (exécutées en parallèle)
+FEATURE_POOL = "feature_eng"
+
+# Moteur du feature engineering: "pandas" (create_insights) ou "polars" (transform_polars)
+TRANSFORM_ENGINE = os.getenv("TRANSFORM_ENGINE", "pandas")
+
+# Colonnes à faible cardinalité, encodées en dictionnaire pour les dimensions
+DIM_CATEGORICAL_COLS = [
+    "gender", "Partner", "Dependents", "PhoneService", "MultipleLines",
+    "InternetService", "OnlineSecurity", "OnlineBackup", "DeviceProtection",
+    "TechSupport", "StreamingTV", "StreamingMovies", "Contract",
+    "PaperlessBilling", "PaymentMethod",
+]
+
 
 # ============================================
 # FONCTIONS DES TASKS
 # ============================================
 
-def task_extract_csv(**context):
+@task(task_id="extract_csv")
+def task_extract_csv():
     """Étape 1a: Extraction CSV depuis MinIO S3."""
     from src.extract.extract_csv import extract_csv_from_minio
 
-    df = extract_csv_from_minio()
-    # Stocker en XCom via fichier temporaire parquet
-    path = "/tmp/df_csv_raw.parquet"
-    df.to_parquet(path, index=False)
-    return path
+    return extract_csv_from_minio()
 
 
-def task_extract_json(**context):
+@task(task_id="extract_json")
+def task_extract_json():
     """Étape 1b: Extraction JSON depuis MinIO S3."""
     from src.extract.extract_json import extract_json_from_minio
 
-    df = extract_json_from_minio()
-    # Standardiser les types mixtes avant sérialisation Parquet
-    for col in df.columns:
-        if df[col].dtype == object:
-            df[col] = df[col].astype(str)
-    path = "/tmp/df_json_raw.parquet"
-    df.to_parquet(path, index=False)
-    return path
+    # Les colonnes aux types mixtes sont unifiées en string à la sérialisation Arrow
+    return extract_json_from_minio()
 
 
-def task_clean_csv(**context):
+@task(task_id="clean_csv")
+def task_clean_csv(df_raw):
     """Étape 2a: Nettoyage des données CSV."""
-    import pandas as pd
     from src.transform.transform_data import clean_data
 
-    ti = context["ti"]
-    raw_path = ti.xcom_pull(task_ids="extract_csv")
-    df = pd.read_parquet(raw_path)
-    df_clean = clean_data(df, source="csv")
-
-    path = "/tmp/df_csv_clean.parquet"
-    df_clean.to_parquet(path, index=False)
-    return path
+    return clean_data(df_raw.to_pandas(), source="csv")
 
 
-def task_clean_json(**context):
+@task(task_id="clean_json")
+def task_clean_json(df_raw):
     """Étape 2b: Nettoyage des données JSON."""
-    import pandas as pd
     from src.transform.transform_data import clean_data
 
-    ti = context["ti"]
-    raw_path = ti.xcom_pull(task_ids="extract_json")
-    df = pd.read_parquet(raw_path)
-    df_clean = clean_data(df, source="json")
+    return clean_data(df_raw.to_pandas(), source="json")
 
-    path = "/tmp/df_json_clean.parquet"
-    df_clean.to_parquet(path, index=False)
-    return path
 
-
-def task_load_silver(**context):
+@task(task_id="load_silver")
+def task_load_silver(df_csv, df_json):
     """Étape 3: Chargement des données nettoyées dans MinIO Silver."""
-    import pandas as pd
-    from src.load.load_to_minio import load_df_to_minio
+    from src.load.load_to_minio import load_dfs_to_minio
 
-    ti = context["ti"]
-    csv_path = ti.xcom_pull(task_ids="clean_csv")
-    json_path = ti.xcom_pull(task_ids="clean_json")
+    # Tables Arrow encodées directement en Parquet, uploads en parallèle
+    load_dfs_to_minio({
+        "csv/telco_churn_clean.parquet": df_csv,
+        "json/telco_synthetic_clean.parquet": df_json,
+    }, "staging")
 
-    df_csv = pd.read_parquet(csv_path)
-    df_json = pd.read_parquet(json_path)
 
-    load_df_to_minio(df_csv, "staging", "csv/telco_churn_clean.parquet")
-    load_df_to_minio(df_json, "staging", "json/telco_synthetic_clean.parquet")
+# Feature engineering: une task par sortie, parallélisées via le pool "feature_eng".
+# max_active_tis_per_dag=1 limite chaque task à une instance à la fois (mémoire worker).
+feature_task = partial(task, pool=FEATURE_POOL, max_active_tis_per_dag=1)
 
 
-def task_feature_engineering(**context):
-    """Étape 4: Feature engineering + création d'insights."""
-    import pandas as pd
-    from src.transform.create_insights import add_engineered_features, create_churn_insights
-    from src.transform.transform_data import (
-        create_dim_customer, create_dim_service,
-        create_dim_contract, create_fact_churn,
-    )
+def _feature_engineering(table, source: str):
+    """Features + insights avec le moteur choisi par TRANSFORM_ENGINE."""
+    if TRANSFORM_ENGINE == "polars":
+        # Polars lit la table Arrow directement, sans passer par pandas
+        from src.transform.transform_polars import add_engineered_features, create_churn_insights
+        df = table
+    else:
+        from src.transform.create_insights import add_engineered_features, create_churn_insights
+        df = table.to_pandas()
 
-    ti = context["ti"]
-    csv_path = ti.xcom_pull(task_ids="clean_csv")
-    json_path = ti.xcom_pull(task_ids="clean_json")
+    df_feat = add_engineered_features(df)
+    return df_feat, create_churn_insights(df_feat, source=source)
 
-    df_csv = pd.read_parquet(csv_path)
-    df_json = pd.read_parquet(json_path)
 
-    # Feature Engineering
-    df_csv_feat = add_engineered_features(df_csv)
-    df_json_feat = add_engineered_features(df_json)
+@feature_task(task_id="feat_csv", multiple_outputs=True)
+def task_feat_csv(df_csv):
+    """Étape 4a: Feature engineering + insights (CSV)."""
+    df_csv_feat, insights_csv = _feature_engineering(df_csv, source="csv")
 
-    # Insights
-    insights_csv = create_churn_insights(df_csv_feat, source="csv")
-    insights_json = create_churn_insights(df_json_feat, source="json")
+    return {"df_csv_feat": df_csv_feat, "insights_csv": insights_csv}
 
-    # Dimensions & Facts (CSV)
-    dim_customer_csv = create_dim_customer(df_csv, source="csv")
-    dim_service_csv = create_dim_service(df_csv)
-    dim_contract_csv = create_dim_contract(df_csv)
-    fact_churn_csv = create_fact_churn(df_csv, source="csv")
 
-    # Dimensions & Facts (JSON)
-    dim_customer_json = create_dim_customer(df_json, source="json")
-    fact_churn_json = create_fact_churn(df_json, source="json")
+@feature_task(task_id="feat_json", multiple_outputs=True)
+def task_feat_json(df_json):
+    """Étape 4b: Feature engineering + insights (JSON)."""
+    df_json_feat, insights_json = _feature_engineering(df_json, source="json")
 
-    # Sauvegarder tous les DataFrames intermédiaires
-    df_csv_feat.to_parquet("/tmp/df_csv_feat.parquet", index=False)
-    df_json_feat.to_parquet("/tmp/df_json_feat.parquet", index=False)
-    insights_csv.to_parquet("/tmp/insights_csv.parquet", index=False)
-    insights_json.to_parquet("/tmp/insights_json.parquet", index=False)
-    dim_customer_csv.to_parquet("/tmp/dim_customer_csv.parquet", index=False)
-    dim_customer_json.to_parquet("/tmp/dim_customer_json.parquet", index=False)
-    dim_service_csv.to_parquet("/tmp/dim_service_csv.parquet", index=False)
-    dim_contract_csv.to_parquet("/tmp/dim_contract_csv.parquet", index=False)
-    fact_churn_csv.to_parquet("/tmp/fact_churn_csv.parquet", index=False)
-    fact_churn_json.to_parquet("/tmp/fact_churn_json.parquet", index=False)
+    return {"df_json_feat": df_json_feat, "insights_json": insights_json}
 
-    return "features_done"
 
+@feature_task(task_id="dims_csv", multiple_outputs=True)
+def task_dims_csv(df_csv):
+    """Étape 4c: Dimensions Customer / Service / Contract (CSV)."""
+    from src.transform.transform_data import create_dim_customer, create_dim_service, create_dim_contract
+    from src.utils.arrow_io import to_pandas_dictionary
 
-def task_load_gold(**context):
-    """Étape 5: Chargement Gold (Parquet) dans MinIO curated."""
-    import pandas as pd
-    from src.load.load_to_minio import load_df_to_minio
-
-    files_to_load = {
-        "features/customer_features_csv.parquet": "/tmp/df_csv_feat.parquet",
-        "features/customer_features_json.parquet": "/tmp/df_json_feat.parquet",
-        "insights/churn_insights_csv.parquet": "/tmp/insights_csv.parquet",
-        "insights/churn_insights_json.parquet": "/tmp/insights_json.parquet",
-        "dimensions/dim_customer_csv.parquet": "/tmp/dim_customer_csv.parquet",
-        "dimensions/dim_customer_json.parquet": "/tmp/dim_customer_json.parquet",
-        "facts/fact_churn_csv.parquet": "/tmp/fact_churn_csv.parquet",
-        "facts/fact_churn_json.parquet": "/tmp/fact_churn_json.parquet",
+    # Converti une seule fois (colonnes catégorielles) et partagé par les 3 dimensions
+    df_csv = to_pandas_dictionary(df_csv, DIM_CATEGORICAL_COLS)
+
+    return {
+        "dim_customer_csv": create_dim_customer(df_csv, source="csv"),
+        "dim_service_csv": create_dim_service(df_csv),
+        "dim_contract_csv": create_dim_contract(df_csv),
     }
 
-    for obj_name, local_path in files_to_load.items():
-        df = pd.read_parquet(local_path)
-        load_df_to_minio(df, "curated", obj_name)
 
+@feature_task(task_id="facts_csv")
+def task_facts_csv(df_csv):
+    """Étape 4d: Table de faits Churn (CSV)."""
+    from src.transform.transform_data import create_fact_churn
+
+    return create_fact_churn(df_csv.to_pandas(), source="csv")
 
-def task_load_warehouse(**context):
-    """Étape 6: Chargement dans PostgreSQL Data Warehouse."""
-    import pandas as pd
-    from src.load.load_to_warehouse import (
-        load_csv_to_staging, load_json_to_staging,
-        load_to_dimensions, load_to_facts,
-        load_insights, load_features,
-    )
 
-    ti = context["ti"]
-    csv_path = ti.xcom_pull(task_ids="clean_csv")
-    json_path = ti.xcom_pull(task_ids="clean_json")
+@feature_task(task_id="dims_json")
+def task_dims_json(df_json):
+    """Étape 4e: Dimension Customer (JSON)."""
+    from src.transform.transform_data import create_dim_customer
+    from src.utils.arrow_io import to_pandas_dictionary
 
-    df_csv = pd.read_parquet(csv_path)
-    df_json = pd.read_parquet(json_path)
+    return create_dim_customer(to_pandas_dictionary(df_json, DIM_CATEGORICAL_COLS), source="json")
 
-    # Staging
-    load_csv_to_staging(df_csv)
-    load_json_to_staging(df_json)
 
-    # Dimensions & Facts
-    dim_customer_csv = pd.read_parquet("/tmp/dim_customer_csv.parquet")
-    dim_service_csv = pd.read_parquet("/tmp/dim_service_csv.parquet")
-    dim_contract_csv = pd.read_parquet("/tmp/dim_contract_csv.parquet")
-    fact_churn_csv = pd.read_parquet("/tmp/fact_churn_csv.parquet")
+@feature_task(task_id="facts_json")
+def task_facts_json(df_json):
+    """Étape 4f: Table de faits Churn (JSON)."""
+    from src.transform.transform_data import create_fact_churn
+
+    return create_fact_churn(df_json.to_pandas(), source="json")
+
+
+@task(task_id="load_gold")
+def task_load_gold(df_csv_feat, df_json_feat, insights_csv, insights_json,
+                   dim_customer_csv, dim_customer_json, fact_churn_csv, fact_churn_json):
+    """Étape 5: Chargement Gold (Parquet) dans MinIO curated."""
+    from src.load.load_to_minio import load_dfs_to_minio
+
+    tables_to_load = {
+        "features/customer_features_csv.parquet": df_csv_feat,
+        "features/customer_features_json.parquet": df_json_feat,
+        "insights/churn_insights_csv.parquet": insights_csv,
+        "insights/churn_insights_json.parquet": insights_json,
+        "dimensions/dim_customer_csv.parquet": dim_customer_csv,
+        "dimensions/dim_customer_json.parquet": dim_customer_json,
+        "facts/fact_churn_csv.parquet": fact_churn_csv,
+        "facts/fact_churn_json.parquet": fact_churn_json,
+    }
 
-    load_to_dimensions(dim_customer_csv, dim_service_csv, dim_contract_csv)
-    load_to_facts(fact_churn_csv)
+    # Tables Arrow encodées directement en Parquet, uploads en parallèle
+    load_dfs_to_minio(tables_to_load, "curated")
 
-    # Insights
-    insights_csv = pd.read_parquet("/tmp/insights_csv.parquet")
-    insights_json = pd.read_parquet("/tmp/insights_json.parquet")
-    load_insights(insights_csv)
-    load_insights(insights_json)
 
-    # Features
-    df_csv_feat = pd.read_parquet("/tmp/df_csv_feat.parquet")
-    df_json_feat = pd.read_parquet("/tmp/df_json_feat.parquet")
+def _prepare_features_for_warehouse(table, source: str):
+    """
+    Ajoute customer_id / has_churned / data_source à une table Arrow de features.
 
-    df_csv_feat_wh = df_csv_feat.copy()
-    df_csv_feat_wh["customer_id"] = df_csv_feat_wh["customerID"]
-    df_csv_feat_wh["has_churned"] = df_csv_feat_wh["Churn"].map({"Yes": True, "No": False}).fillna(False).astype(bool)
-    df_csv_feat_wh["data_source"] = "csv"
-    load_features(df_csv_feat_wh)
+    Colonnes ajoutées sans copie de la table: has_churned est une comparaison
+    vectorisée ("Yes" → True, sinon / NULL → False), data_source une constante.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
 
-    df_json_feat_wh = df_json_feat.copy()
-    df_json_feat_wh["customer_id"] = df_json_feat_wh["customerID"]
-    df_json_feat_wh["has_churned"] = df_json_feat_wh["Churn"].map({"Yes": True, "No": False}).fillna(False).astype(bool)
-    df_json_feat_wh["data_source"] = "json"
-    load_features(df_json_feat_wh)
+    has_churned = pc.fill_null(pc.equal(table["Churn"], "Yes"), False)
+    table = table.append_column("customer_id", table["customerID"])
+    table = table.append_column("has_churned", has_churned)
+    return table.append_column("data_source", pa.repeat(source, len(table)))
+
+
+@task(task_id="load_warehouse")
+def task_load_warehouse(df_csv, df_json, dim_customer_csv, dim_service_csv, dim_contract_csv,
+                        fact_churn_csv, insights_csv, insights_json, df_csv_feat, df_json_feat):
+    """Étape 6: Chargement dans PostgreSQL Data Warehouse."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.load.load_to_warehouse import (
+        load_csv_to_staging, load_json_to_staging,
+        load_to_dimensions, load_to_facts,
+        load_insights, load_features,
+    )
+
+    # Staging: tables Arrow memory-mappées streamées par lots vers COPY (pool psycopg2 du process).
+    # Warehouse: ingestion Arrow native via ADBC, une connexion par chargement.
+    # Chargements indépendants: exécutés en parallèle.
+    loads = [
+        # Staging
+        partial(load_csv_to_staging, df_csv),
+        partial(load_json_to_staging, df_json),
+        # Dimensions & Facts
+        partial(load_to_dimensions, dim_customer_csv, dim_service_csv, dim_contract_csv),
+        partial(load_to_facts, fact_churn_csv),
+        # Insights
+        partial(load_insights, insights_csv),
+        partial(load_insights, insights_json),
+        # Features
+        partial(load_features, _prepare_features_for_warehouse(df_csv_feat, "csv")),
+        partial(load_features, _prepare_features_for_warehouse(df_json_feat, "json")),
+    ]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(load) for load in loads]
+        for future in futures:
+            future.result()
 
     print("\n✅ PIPELINE ELT TERMINÉ AVEC SUCCÈS!")
 
@@ -251,55 +273,54 @@ with DAG(
     tags=["telco", "elt", "churn", "data-engineering"],
 ) as dag:
 
-    # --- Tasks ---
-    t_extract_csv = PythonOperator(
-        task_id="extract_csv",
-        python_callable=task_extract_csv,
-    )
-
-    t_extract_json = PythonOperator(
-        task_id="extract_json",
-        python_callable=task_extract_json,
-    )
-
-    t_clean_csv = PythonOperator(
-        task_id="clean_csv",
-        python_callable=task_clean_csv,
-    )
-
-    t_clean_json = PythonOperator(
-        task_id="clean_json",
-        python_callable=task_clean_json,
-    )
-
-    t_load_silver = PythonOperator(
-        task_id="load_silver",
-        python_callable=task_load_silver,
-    )
-
-    t_feature_eng = PythonOperator(
-        task_id="feature_engineering",
-        python_callable=task_feature_engineering,
-    )
-
-    t_load_gold = PythonOperator(
-        task_id="load_gold",
-        python_callable=task_load_gold,
+    # --- Tasks (les dépendances de données découlent des arguments) ---
+    df_csv_raw = task_extract_csv()
+    df_json_raw = task_extract_json()
+
+    df_csv_clean = task_clean_csv(df_csv_raw)
+    df_json_clean = task_clean_json(df_json_raw)
+
+    t_load_silver = task_load_silver(df_csv_clean, df_json_clean)
+
+    feat_csv = task_feat_csv(df_csv_clean)
+    feat_json = task_feat_json(df_json_clean)
+    dims_csv = task_dims_csv(df_csv_clean)
+    fact_churn_csv = task_facts_csv(df_csv_clean)
+    dim_customer_json = task_dims_json(df_json_clean)
+    fact_churn_json = task_facts_json(df_json_clean)
+
+    t_load_gold = task_load_gold(
+        df_csv_feat=feat_csv["df_csv_feat"],
+        df_json_feat=feat_json["df_json_feat"],
+        insights_csv=feat_csv["insights_csv"],
+        insights_json=feat_json["insights_json"],
+        dim_customer_csv=dims_csv["dim_customer_csv"],
+        dim_customer_json=dim_customer_json,
+        fact_churn_csv=fact_churn_csv,
+        fact_churn_json=fact_churn_json,
     )
 
-    t_load_warehouse = PythonOperator(
-        task_id="load_warehouse",
-        python_callable=task_load_warehouse,
+    t_load_warehouse = task_load_warehouse(
+        df_csv=df_csv_clean,
+        df_json=df_json_clean,
+        dim_customer_csv=dims_csv["dim_customer_csv"],
+        dim_service_csv=dims_csv["dim_service_csv"],
+        dim_contract_csv=dims_csv["dim_contract_csv"],
+        fact_churn_csv=fact_churn_csv,
+        insights_csv=feat_csv["insights_csv"],
+        insights_json=feat_json["insights_json"],
+        df_csv_feat=feat_csv["df_csv_feat"],
+        df_json_feat=feat_json["df_json_feat"],
     )
 
     # --- Dépendances (DAG Graph) ---
     #
-    #   extract_csv  ──→  clean_csv  ──┐
-    #                                  ├──→ load_silver ──→ feature_engineering ──┬──→ load_gold
-    #   extract_json ──→  clean_json ──┘                                         └──→ load_warehouse
+    #                                                     ┌──→ feat_csv   ──┐
+    #   extract_csv  ──→  clean_csv  ──┐                  ├──→ feat_json  ──┤
+    #                                  ├──→ load_silver ──┼──→ dims_csv   ──┼──┬──→ load_gold
+    #   extract_json ──→  clean_json ──┘                  ├──→ facts_csv  ──┤  └──→ load_warehouse
+    #                                                     ├──→ dims_json  ──┤
+    #                                                     └──→ facts_json ──┘
     #
 
-    t_extract_csv >> t_clean_csv
-    t_extract_json >> t_clean_json
-    [t_clean_csv, t_clean_json] >> t_load_silver >> t_feature_eng
-    t_feature_eng >> [t_load_gold, t_load_warehouse]
+    t_load_silver >> [feat_csv, feat_json, dims_csv, fact_churn_csv, dim_customer_json, fact_churn_json]
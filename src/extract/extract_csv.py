@@ -1,11 +1,73 @@
 """
 Extract CSV - Extraction des données CSV depuis MinIO S3
 Source: Bucket telco-raw / csv/telco_churn_with_all_feedback.csv
+
+Le parsing est délégué à Polars (multi-thread, colonnaire) ; la conversion
+en pandas n'a lieu qu'en sortie, pour les transformations en aval.
 """
 
 import pandas as pd
-import io
-from src.utils.minio_client import get_minio_client, load_config
+import polars as pl
+from src.utils.minio_client import get_minio_client, load_config, parallel_get, PARALLEL_GET_MIN_SIZE
+
+
+def _read_csv(source) -> pl.DataFrame:
+    """Parse un CSV UTF-8 avec Polars (schéma inféré sur tout le fichier)."""
+    return pl.read_csv(source, infer_schema_length=None)
+
+
+def _is_invalid_utf8(error: pl.exceptions.ComputeError) -> bool:
+    """Vrai si Polars a rejeté le CSV pour un encodage non UTF-8."""
+    return "invalid utf-8" in str(error).lower()
+
+
+def _transcode_to_utf8(csv_data: bytes) -> bytes:
+    """Transcode un CSV non UTF-8 en UTF-8: utf-16 (BOM), sinon latin-1."""
+    encoding = "utf-16" if csv_data[:2] in (b"\xff\xfe", b"\xfe\xff") else "latin-1"
+    return csv_data.decode(encoding).encode("utf-8")
+
+
+def _parse_csv_bytes(csv_data: bytes) -> pl.DataFrame:
+    """
+    Parse un CSV en mémoire.
+
+    Les octets sont passés tels quels à Polars (sans copie ni décodage
+    Python); ils ne sont transcodés (utf-16 / latin-1) que si Polars les
+    rejette comme UTF-8 invalide. Les autres erreurs de parsing remontent.
+    """
+    try:
+        return _read_csv(csv_data)
+    except pl.exceptions.ComputeError as e:
+        if not _is_invalid_utf8(e):
+            raise
+    return _read_csv(_transcode_to_utf8(csv_data))
+
+
+def _stream_csv(client, bucket_name: str, object_name: str) -> pl.DataFrame:
+    """
+    Parse un CSV en passant la réponse MinIO à Polars.
+
+    Un flux HTTP consommé ne se relit pas: si Polars le rejette comme UTF-8
+    invalide, l'objet est re-téléchargé puis transcodé (cas rare). Les
+    autres erreurs de parsing remontent.
+    """
+    response = client.get_object(bucket_name, object_name)
+    try:
+        return _read_csv(response)
+    except pl.exceptions.ComputeError as e:
+        if not _is_invalid_utf8(e):
+            raise
+    finally:
+        response.close()
+        response.release_conn()
+
+    response = client.get_object(bucket_name, object_name)
+    try:
+        csv_data = response.read()
+    finally:
+        response.close()
+        response.release_conn()
+    return _read_csv(_transcode_to_utf8(csv_data))
 
 
 def extract_csv_from_minio(bucket_name: str = None, object_name: str = "csv/telco_churn_with_all_feedback.csv") -> pd.DataFrame:
@@ -27,23 +89,15 @@ def extract_csv_from_minio(bucket_name: str = None, object_name: str = "csv/telc
     if bucket_name is None:
         bucket_name = config["minio"]["buckets"]["raw"]
 
-    # Télécharger le CSV depuis MinIO
-    response = client.get_object(bucket_name, object_name)
-    csv_data = response.read()
-    response.close()
-    response.release_conn()
+    size = client.stat_object(bucket_name, object_name).size
+    if size >= PARALLEL_GET_MIN_SIZE:
+        # Gros objet: téléchargement par plages parallèles, puis parsing du buffer
+        df_pl = _parse_csv_bytes(parallel_get(client, bucket_name, object_name, size))
+    else:
+        # Réponse HTTP lue directement par Polars, sans bytes intermédiaires côté Python
+        df_pl = _stream_csv(client, bucket_name, object_name)
 
-    # Parser le CSV (détection automatique de l'encodage)
-    raw = io.BytesIO(csv_data)
-    try:
-        df = pd.read_csv(raw, encoding="utf-8")
-    except UnicodeDecodeError:
-        raw.seek(0)
-        try:
-            df = pd.read_csv(raw, encoding="utf-16")
-        except Exception:
-            raw.seek(0)
-            df = pd.read_csv(raw, encoding="latin-1")
+    df = df_pl.to_pandas()
 
     print(f"  ✅ {len(df)} lignes extraites depuis s3://{bucket_name}/{object_name}")
     print(f"  📊 Colonnes: {list(df.columns)}")
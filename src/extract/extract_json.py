@@ -4,12 +4,47 @@ Source: Bucket telco-raw / json/synthetic_telco_data.json
 
 Les données sont déjà uploadées dans MinIO S3.
 On lit directement depuis le Data Lake (pas de fichier local).
+La normalisation (aplatissement des objets imbriqués) est faite par Polars.
 """
 
+import orjson
 import pandas as pd
-import json
-import io
-from src.utils.minio_client import get_minio_client, load_config
+import polars as pl
+from src.utils.minio_client import get_minio_client, load_config, parallel_get, PARALLEL_GET_MIN_SIZE
+
+
+def _json_payload(json_data):
+    """
+    Prépare le contenu pour orjson d'après le BOM.
+
+    UTF-8 (défaut RFC 8259): les octets sont passés tels quels, sans décodage
+    (BOM UTF-8 retiré par une vue). UTF-16: décodé en str.
+    """
+    if json_data[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return json_data.decode("utf-16")
+    if json_data[:3] == b"\xef\xbb\xbf":
+        return memoryview(json_data)[3:]
+    return json_data
+
+
+def _normalize_records(records: list) -> pl.DataFrame:
+    """
+    Équivalent Polars de pd.json_normalize: les objets imbriqués sont
+    aplatis en colonnes "parent.enfant" (ex: metadata.source).
+    """
+    df = pl.from_dicts(records, infer_schema_length=None, strict=False)
+
+    struct_cols = [name for name, dtype in df.schema.items() if isinstance(dtype, pl.Struct)]
+    while struct_cols:
+        df = df.with_columns([
+            pl.col(col).struct.rename_fields(
+                [f"{col}.{field.name}" for field in df.schema[col].fields]
+            )
+            for col in struct_cols
+        ]).unnest(struct_cols)
+        struct_cols = [name for name, dtype in df.schema.items() if isinstance(dtype, pl.Struct)]
+
+    return df
 
 
 def extract_json_from_minio(bucket_name: str = None, object_name: str = "json/synthetic_telco_data.json") -> pd.DataFrame:
@@ -31,25 +66,30 @@ def extract_json_from_minio(bucket_name: str = None, object_name: str = "json/sy
     if bucket_name is None:
         bucket_name = config["minio"]["buckets"]["raw"]
 
-    # Télécharger le JSON depuis MinIO
-    response = client.get_object(bucket_name, object_name)
-    json_data = response.read()
-    response.close()
-    response.release_conn()
+    # Télécharger le JSON depuis MinIO (par plages parallèles pour les gros objets)
+    size = client.stat_object(bucket_name, object_name).size
+    if size >= PARALLEL_GET_MIN_SIZE:
+        json_data = parallel_get(client, bucket_name, object_name, size)
+    else:
+        response = client.get_object(bucket_name, object_name)
+        try:
+            json_data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
 
-    # Parser le JSON (détection automatique de l'encodage)
-    for encoding in ("utf-8", "utf-16", "latin-1"):
+    # Parser le JSON avec orjson (UTF-8 lu directement en bytes, sinon latin-1)
+    try:
+        data = orjson.loads(_json_payload(json_data))
+    except orjson.JSONDecodeError:
         try:
-            data = json.loads(json_data.decode(encoding))
-            break
-        except (UnicodeDecodeError, json.JSONDecodeError):
-            continue
-    else:
-        raise ValueError("Impossible de décoder le fichier JSON")
+            data = orjson.loads(json_data.decode("latin-1"))
+        except orjson.JSONDecodeError as e:
+            raise ValueError("Impossible de décoder le fichier JSON") from e
 
     # Extraire les résultats
     results = data.get("results", [])
-    df = pd.json_normalize(results)
+    df = _normalize_records(results).to_pandas()
 
     # Renommer les colonnes metadata
     if "metadata.source" in df.columns:
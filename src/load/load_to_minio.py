@@ -6,11 +6,113 @@ Architecture Data Lake (Medallion):
     🥉 Bronze (telco-raw)     : Données brutes telles quelles
     🥈 Silver (telco-staging)  : Données nettoyées
     🥇 Gold (telco-curated)    : Données transformées prêtes pour le warehouse
+
+Le Parquet est encodé par row groups dans un thread dédié et envoyé au fil
+de l'eau (upload multipart de taille inconnue): l'encodage et l'upload se
+recouvrent, sans buffer complet du fichier en mémoire.
 """
 
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import io
-from src.utils.minio_client import get_minio_client, create_buckets, upload_data, load_config
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.arrow_io import to_arrow_table
+from src.utils.minio_client import get_minio_client, ensure_buckets, upload_batch, load_config
+
+
+# Taille des parts de l'upload multipart (MinIO: minimum 5 MiB)
+UPLOAD_PART_SIZE = 16 * 1024 * 1024
+
+# Lignes par row group Parquet (granularité de l'encodage en streaming,
+# alignée sur les lots de lecture en aval)
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Options d'écriture Parquet communes à tous les objets du Data Lake:
+# zstd niveau 3 (~30% plus compact que snappy pour un coût CPU proche),
+# dictionnaire pour les nombreuses colonnes catégorielles, pages de 1 MiB.
+PARQUET_WRITE_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "use_dictionary": True,
+    "data_page_size": 1 << 20,
+}
+
+
+class _PipeStream:
+    """
+    Tube en mémoire entre l'encodeur Parquet (write) et l'upload MinIO (read).
+
+    La file est bornée: si l'upload est plus lent que l'encodage, l'encodeur
+    attend, ce qui plafonne la mémoire à quelques blocs.
+    """
+
+    def __init__(self, max_chunks: int = 64):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._buffer = bytearray()
+        self._eof = False
+        self._error = None
+        self._aborted = threading.Event()
+        self.closed = False  # requis par pyarrow pour un sink Python
+
+    # --- Côté encodeur ---
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        while not self._aborted.is_set():
+            try:
+                self._queue.put(chunk, timeout=1)
+                return len(chunk)
+            except queue.Full:
+                continue
+        raise IOError("Upload MinIO interrompu")
+
+    def flush(self):
+        pass
+
+    def finish(self, error: Exception = None):
+        """Signale la fin du flux (ou l'erreur d'encodage) au lecteur."""
+        self._error = error
+        while not self._aborted.is_set():
+            try:
+                self._queue.put(None, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    # --- Côté upload ---
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = self._queue.get()
+            if chunk is None:
+                self._eof = True
+                if self._error is not None:
+                    raise self._error
+                break
+            self._buffer.extend(chunk)
+
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def abort(self):
+        """Débloque l'encodeur si l'upload a échoué."""
+        self._aborted.set()
+
+
+def _write_parquet(table: pa.Table, stream: _PipeStream):
+    """Encode la table en Parquet (row group par row group) dans le tube."""
+    try:
+        with pq.ParquetWriter(stream, table.schema, **PARQUET_WRITE_OPTIONS) as writer:
+            writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_SIZE)
+    except Exception as e:
+        stream.finish(e)
+        raise
+    stream.finish()
 
 
 def load_df_to_minio(df: pd.DataFrame, bucket_key: str, object_name: str):
@@ -18,27 +120,52 @@ def load_df_to_minio(df: pd.DataFrame, bucket_key: str, object_name: str):
     Charge un DataFrame (format Parquet) dans un bucket MinIO.
 
     Args:
-        df: DataFrame pandas à charger
+        df: DataFrame pandas (ou table Arrow) à charger
         bucket_key: Clé du bucket dans la config ('raw', 'staging', 'curated')
         object_name: Nom de l'objet dans le bucket (ex: 'customers.parquet')
     """
-    print(f"\n📤 LOAD TO MINIO ({bucket_key}): {object_name}")
+    load_dfs_to_minio({object_name: df}, bucket_key)
+
+
+def load_dfs_to_minio(frames: dict, bucket_key: str):
+    """
+    Charge plusieurs DataFrames (format Parquet) dans un bucket MinIO, en parallèle.
+
+    Chaque objet a son encodeur Parquet et son upload en streaming; les
+    uploads sont lancés ensemble via upload_batch.
+
+    Args:
+        frames: {nom de l'objet: DataFrame pandas ou table Arrow}
+        bucket_key: Clé du bucket dans la config ('raw', 'staging', 'curated')
+    """
+    print(f"\n📤 LOAD TO MINIO ({bucket_key}): {len(frames)} objets")
+    if not frames:
+        return
 
     config = load_config()
     client = get_minio_client()
-    create_buckets(client)
+    ensure_buckets()
 
     bucket = config["minio"]["buckets"][bucket_key]
 
-    # Convertir le DataFrame en Parquet (format optimal pour le Data Lake)
-    parquet_buffer = io.BytesIO()
-    df.to_parquet(parquet_buffer, index=False, engine="pyarrow")
-    parquet_buffer.seek(0)
-
-    upload_data(
-        client, bucket, object_name,
-        parquet_buffer, len(parquet_buffer.getvalue()),
-        content_type="application/octet-stream"
-    )
+    tables = {
+        name: df if isinstance(df, pa.Table) else to_arrow_table(df)
+        for name, df in frames.items()
+    }
+    streams = {name: _PipeStream() for name in tables}
+    with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+        encoders = [executor.submit(_write_parquet, tables[name], streams[name]) for name in tables]
+        try:
+            upload_batch(client, [
+                (bucket, name, streams[name], -1, "application/octet-stream", UPLOAD_PART_SIZE)
+                for name in tables
+            ])
+        except Exception:
+            for stream in streams.values():
+                stream.abort()
+            raise
+        for encoder in encoders:
+            encoder.result()
 
-    print(f"  📊 {len(df)} lignes chargées en Parquet")
+    for name, table in tables.items():
+        print(f"  📊 {name}: {len(table)} lignes chargées en Parquet")
@@ -5,113 +5,123 @@ Charge les données transformées dans le Data Warehouse.
 Architecture:
     staging.*   → Données brutes (depuis le Data Lake)
     warehouse.* → Données transformées (modèle dimensionnel)
+
+Les fonctions acceptent un DataFrame pandas ou une table Arrow (memory-map):
+    staging.*   → COPY CSV par lots (psycopg2), connexion empruntée au pool
+                  du process (db_client.get_connection_pool) ou au pool
+                  passé en paramètre
+    warehouse.* → ingestion Arrow native via ADBC (db_client.ingest_arrow),
+                  une connexion ADBC par chargement
 """
 
 import pandas as pd
-from src.utils.db_client import get_db_connection, insert_dataframe
+import pyarrow as pa
+from src.utils.db_client import db_connection, insert_dataframe, get_adbc_connection, ingest_arrow
+
+
+# --- Colonnes des tables cible ---
+# La projection est faite avant toute conversion ou sérialisation: sur une
+# table Arrow memory-mappée, seules les pages de ces colonnes sont lues.
+
+STAGING_COLS_CSV = [
+    "customerID", "gender", "SeniorCitizen", "Partner", "Dependents",
+    "tenure", "PhoneService", "MultipleLines", "InternetService",
+    "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport",
+    "StreamingTV", "StreamingMovies", "Contract", "PaperlessBilling",
+    "PaymentMethod", "MonthlyCharges", "TotalCharges", "Churn",
+    "PromptInput", "CustomerFeedback"
+]
+
+STAGING_COLS_JSON = [
+    "customerID", "gender", "SeniorCitizen", "Partner", "Dependents",
+    "tenure", "PhoneService", "MultipleLines", "InternetService",
+    "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport",
+    "StreamingTV", "StreamingMovies", "Contract", "PaperlessBilling",
+    "PaymentMethod", "MonthlyCharges", "TotalCharges", "Churn",
+    "CustomerFeedback", "source", "source_timestamp"
+]
+
+FEATURE_COLS = [
+    "customer_id", "tenure_group", "monthly_charges_group",
+    "total_services", "has_streaming", "has_security",
+    "is_high_value", "avg_monthly_spend", "contract_risk_score",
+    "has_churned", "data_source"
+]
+
+
+def _select_columns(data, columns: list):
+    """
+    Projection sur les colonnes présentes (DataFrame pandas ou table Arrow).
+
+    Pas de copie: insert_dataframe / ingest_arrow ne modifient jamais les
+    données reçues.
+    """
+    if isinstance(data, pa.Table):
+        return data.select([c for c in columns if c in data.column_names])
+    return data[[c for c in columns if c in data.columns]]
 
 
-def load_csv_to_staging(df: pd.DataFrame):
+def load_csv_to_staging(df: pa.Table | pd.DataFrame, pool=None):
     """
-    Charge les données CSV dans la table de staging.
+    Charge les données CSV (table Arrow ou DataFrame pandas) dans la table de staging.
     """
     print("\n📤 LOAD TO WAREHOUSE (Staging): CSV → staging.telco_churn_raw")
 
-    conn = get_db_connection()
-    try:
+    with db_connection(pool) as conn:
         # Sélectionner les colonnes attendues par la table
-        staging_cols = [
-            "customerID", "gender", "SeniorCitizen", "Partner", "Dependents",
-            "tenure", "PhoneService", "MultipleLines", "InternetService",
-            "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport",
-            "StreamingTV", "StreamingMovies", "Contract", "PaperlessBilling",
-            "PaymentMethod", "MonthlyCharges", "TotalCharges", "Churn",
-            "PromptInput", "CustomerFeedback"
-        ]
-        df_staging = df[[c for c in staging_cols if c in df.columns]].copy()
+        df_staging = _select_columns(df, STAGING_COLS_CSV)
         insert_dataframe(conn, "staging.telco_churn_raw", df_staging)
-    finally:
-        conn.close()
 
 
-def load_json_to_staging(df: pd.DataFrame):
+def load_json_to_staging(df: pa.Table | pd.DataFrame, pool=None):
     """
-    Charge les données JSON dans la table de staging.
+    Charge les données JSON (table Arrow ou DataFrame pandas) dans la table de staging.
     """
     print("\n📤 LOAD TO WAREHOUSE (Staging): JSON → staging.telco_synthetic_raw")
 
-    conn = get_db_connection()
-    try:
-        staging_cols = [
-            "customerID", "gender", "SeniorCitizen", "Partner", "Dependents",
-            "tenure", "PhoneService", "MultipleLines", "InternetService",
-            "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport",
-            "StreamingTV", "StreamingMovies", "Contract", "PaperlessBilling",
-            "PaymentMethod", "MonthlyCharges", "TotalCharges", "Churn",
-            "CustomerFeedback", "source", "source_timestamp"
-        ]
-        df_staging = df[[c for c in staging_cols if c in df.columns]].copy()
+    with db_connection(pool) as conn:
+        df_staging = _select_columns(df, STAGING_COLS_JSON)
         insert_dataframe(conn, "staging.telco_synthetic_raw", df_staging)
-    finally:
-        conn.close()
 
 
-def load_to_dimensions(df_customers: pd.DataFrame, df_services: pd.DataFrame, df_contracts: pd.DataFrame):
+def load_to_dimensions(df_customers: pa.Table | pd.DataFrame, df_services: pa.Table | pd.DataFrame, df_contracts: pa.Table | pd.DataFrame):
     """
-    Charge les dimensions transformées dans le warehouse.
+    Charge les dimensions transformées (tables Arrow ou DataFrames pandas) dans le warehouse.
     """
     print("\n📤 LOAD TO WAREHOUSE: Dimensions")
 
-    conn = get_db_connection()
-    try:
-        insert_dataframe(conn, "warehouse.dim_customer", df_customers)
-        insert_dataframe(conn, "warehouse.dim_service", df_services)
-        insert_dataframe(conn, "warehouse.dim_contract", df_contracts)
-    finally:
-        conn.close()
+    with get_adbc_connection() as conn:
+        ingest_arrow(conn, "warehouse.dim_customer", df_customers)
+        ingest_arrow(conn, "warehouse.dim_service", df_services)
+        ingest_arrow(conn, "warehouse.dim_contract", df_contracts)
 
 
-def load_to_facts(df_facts: pd.DataFrame):
+def load_to_facts(df_facts: pa.Table | pd.DataFrame):
     """
-    Charge la table de faits dans le warehouse.
+    Charge la table de faits (table Arrow ou DataFrame pandas) dans le warehouse.
     """
     print("\n📤 LOAD TO WAREHOUSE: Facts")
 
-    conn = get_db_connection()
-    try:
-        insert_dataframe(conn, "warehouse.fact_churn", df_facts)
-    finally:
-        conn.close()
+    with get_adbc_connection() as conn:
+        ingest_arrow(conn, "warehouse.fact_churn", df_facts)
 
 
-def load_insights(df_insights: pd.DataFrame):
+def load_insights(df_insights: pa.Table | pd.DataFrame):
     """
-    Charge les insights agrégés dans le warehouse (pour Grafana).
+    Charge les insights agrégés (table Arrow ou DataFrame pandas) dans le warehouse (pour Grafana).
     """
     print("\n📤 LOAD TO WAREHOUSE: Insights → warehouse.churn_insights")
 
-    conn = get_db_connection()
-    try:
-        insert_dataframe(conn, "warehouse.churn_insights", df_insights)
-    finally:
-        conn.close()
+    with get_adbc_connection() as conn:
+        ingest_arrow(conn, "warehouse.churn_insights", df_insights)
 
 
-def load_features(df_features: pd.DataFrame):
+def load_features(df_features: pa.Table | pd.DataFrame):
     """
-    Charge les features engineerées dans le warehouse.
+    Charge les features engineerées (table Arrow ou DataFrame pandas) dans le warehouse.
     """
     print("\n📤 LOAD TO WAREHOUSE: Features → warehouse.customer_features")
 
-    conn = get_db_connection()
-    try:
-        feature_cols = [
-            "customer_id", "tenure_group", "monthly_charges_group",
-            "total_services", "has_streaming", "has_security",
-            "is_high_value", "avg_monthly_spend", "contract_risk_score",
-            "has_churned", "data_source"
-        ]
-        df_feat = df_features[[c for c in feature_cols if c in df_features.columns]].copy()
-        insert_dataframe(conn, "warehouse.customer_features", df_feat)
-    finally:
-        conn.close()
+    with get_adbc_connection() as conn:
+        df_feat = _select_columns(df_features, FEATURE_COLS)
+        ingest_arrow(conn, "warehouse.customer_features", df_feat)
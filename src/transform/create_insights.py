@@ -16,6 +16,22 @@ Insights créés:
 
 import pandas as pd
 import numpy as np
+from numba import njit
+
+
+def _bin_categorical(values: pd.Series, bins: list, labels: list) -> pd.Categorical:
+    """
+    Équivalent de pd.cut(include_lowest=True, ordered=True) par np.searchsorted.
+
+    Intervalles fermés à droite ((0, 12], (12, 24]...), borne basse incluse
+    dans la première tranche; valeurs hors bornes ou manquantes → NaN.
+    """
+    x = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    edges = np.asarray(bins, dtype=np.float64)
+    codes = np.searchsorted(edges, x, side="left") - 1
+    codes[x == edges[0]] = 0
+    codes[(codes < 0) | (codes >= len(labels))] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
 
 
 def add_engineered_features(df: pd.DataFrame) -> pd.DataFrame:
@@ -34,48 +50,40 @@ def add_engineered_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     print("\n🔄 TRANSFORM: Ajout de features engineerées")
 
-    df_feat = df.copy()
+    # Copie superficielle: on ne fait qu'ajouter des colonnes
+    df_feat = df.copy(deep=False)
 
-    # 1. Tenure Group
-    df_feat["tenure_group"] = pd.cut(
+    # 1. Tenure Group (Categorical ordonné, les valeurs hors tranches restent manquantes)
+    df_feat["tenure_group"] = _bin_categorical(
         df_feat["tenure"],
         bins=[0, 12, 24, 48, 60, 100],
         labels=["0-12 mois", "13-24 mois", "25-48 mois", "49-60 mois", "61+ mois"],
-        include_lowest=True
-    ).astype(str)
+    )
 
     # 2. Monthly Charges Group
-    df_feat["monthly_charges_group"] = pd.cut(
+    df_feat["monthly_charges_group"] = _bin_categorical(
         df_feat["MonthlyCharges"],
         bins=[0, 30, 50, 70, 90, 200],
         labels=["0-30$", "31-50$", "51-70$", "71-90$", "91+$"],
-        include_lowest=True
-    ).astype(str)
+    )
 
     # 3. Total Services Count
     service_cols = ["PhoneService", "MultipleLines", "InternetService",
                     "OnlineSecurity", "OnlineBackup", "DeviceProtection",
                     "TechSupport", "StreamingTV", "StreamingMovies"]
 
-    df_feat["total_services"] = 0
-    for col in service_cols:
-        if col in df_feat.columns:
-            df_feat["total_services"] += (
-                df_feat[col].apply(lambda x: 1 if str(x) in ["Yes", "DSL", "Fiber optic"] else 0)
-            )
-
-    # 4. Has Streaming
-    df_feat["has_streaming"] = (
-        (df_feat.get("StreamingTV", "No") == "Yes") |
-        (df_feat.get("StreamingMovies", "No") == "Yes")
+    present = [col for col in service_cols if col in df_feat.columns]
+    df_feat["total_services"] = (
+        df_feat[present].isin(["Yes", "DSL", "Fiber optic"]).sum(axis=1).astype(np.int8)
     )
 
-    # 5. Has Security Bundle
-    df_feat["has_security"] = (
-        (df_feat.get("OnlineSecurity", "No") == "Yes") |
-        (df_feat.get("OnlineBackup", "No") == "Yes") |
-        (df_feat.get("DeviceProtection", "No") == "Yes")
-    )
+    # 4. Has Streaming / 5. Has Security Bundle (colonnes absentes = "No")
+    for feature, cols in [
+        ("has_streaming", ["StreamingTV", "StreamingMovies"]),
+        ("has_security", ["OnlineSecurity", "OnlineBackup", "DeviceProtection"]),
+    ]:
+        present = [col for col in cols if col in df_feat.columns]
+        df_feat[feature] = df_feat[present].isin(["Yes"]).any(axis=1).to_numpy()
 
     # 6. Is High Value
     median_charges = df_feat["MonthlyCharges"].median()
@@ -94,7 +102,9 @@ def add_engineered_features(df: pd.DataFrame) -> pd.DataFrame:
         "One year": 2,
         "Two year": 1
     }
-    df_feat["contract_risk_score"] = df_feat["Contract"].map(contract_risk).fillna(2)
+    df_feat["contract_risk_score"] = (
+        df_feat["Contract"].map(contract_risk).astype("float64").fillna(2).astype(np.int8)
+    )
 
     print(f"  ✅ {len(df_feat)} lignes avec {len(df_feat.columns)} features")
     print(f"  📊 Nouvelles features: tenure_group, monthly_charges_group, total_services,")
@@ -103,6 +113,85 @@ def add_engineered_features(df: pd.DataFrame) -> pd.DataFrame:
     return df_feat
 
 
+INSIGHT_COLUMNS = [
+    "insight_name", "dimension", "category",
+    "total_customers", "churned_customers", "churn_rate",
+    "avg_monthly_charges", "avg_tenure", "avg_total_charges",
+    "data_source",
+]
+
+
+@njit(cache=True)
+def _agg_fused(codes, has_churned, values, n_groups):
+    """
+    Agrégats de tous les indicateurs en un seul passage sur les lignes.
+
+    codes: code de groupe par ligne (-1 = clé manquante, ignorée);
+    values: matrice (n_lignes, n_mesures), NaN ignorés comme par pandas.
+    Retourne (effectifs, churnés, sommes par mesure, non-NaN par mesure).
+    """
+    n_measures = values.shape[1]
+    total = np.zeros(n_groups, np.int64)
+    churned = np.zeros(n_groups, np.int64)
+    sums = np.zeros((n_groups, n_measures), np.float64)
+    counts = np.zeros((n_groups, n_measures), np.int64)
+    for i in range(codes.shape[0]):
+        c = codes[i]
+        if c < 0:
+            continue
+        total[c] += 1
+        if has_churned[i]:
+            churned[c] += 1
+        for j in range(n_measures):
+            v = values[i, j]
+            if not np.isnan(v):
+                sums[c, j] += v
+                counts[c, j] += 1
+    return total, churned, sums, counts
+
+
+def _insight_frame(codes: np.ndarray, categories, measures: dict,
+                   insight_name: str, dimension: str, source: str) -> pd.DataFrame:
+    """
+    Lignes d'insight typées (une par catégorie) à partir des codes de groupe.
+
+    Tous les indicateurs sont calculés en un seul passage par le noyau
+    _agg_fused sur les tableaux de `measures`; les colonnes numériques
+    gardent leurs dtypes NumPy (churn_rate en float32).
+    """
+    total, churned, sums, counts = _agg_fused(
+        codes, measures["has_churned"], measures["values"], len(categories)
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        churn_rate = churned / total * 100
+        means = sums / counts
+
+    return pd.DataFrame({
+        "insight_name": insight_name,
+        "dimension": dimension,
+        "category": categories,
+        "total_customers": total,
+        "churned_customers": churned,
+        "churn_rate": np.round(churn_rate, 2).astype(np.float32),
+        "avg_monthly_charges": np.round(means[:, 0], 2),
+        "avg_tenure": np.round(means[:, 1], 1),
+        "avg_total_charges": np.round(means[:, 2], 2),
+        "data_source": source,
+    }, columns=INSIGHT_COLUMNS)
+
+
+def _agg_insight(keys: pd.Series, measures: dict, insight_name: str, source: str) -> pd.DataFrame:
+    """
+    Agrège les indicateurs de churn par catégorie de `keys` (colonne dimension).
+
+    Les catégories sont factorisées une fois (clés manquantes ignorées, comme
+    avec groupby), puis agrégées par _insight_frame sur les tableaux de
+    `measures` (extraits une seule fois par create_churn_insights).
+    """
+    codes, uniques = pd.factorize(keys, sort=True)
+    return _insight_frame(codes, pd.Index(uniques).astype(str), measures, insight_name, keys.name, source)
+
+
 def create_churn_insights(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
     """
     Crée une table d'insights agrégés pour Grafana.
@@ -121,139 +210,57 @@ def create_churn_insights(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame
     """
     print(f"\n🔄 TRANSFORM: Création des insights ({source})")
 
-    insights = []
-
-    # Convertir Churn en booléen
-    df_work = df.copy()
-    if df_work["Churn"].dtype == object:
-        df_work["has_churned"] = df_work["Churn"].map({"Yes": True, "No": False})
+    # Convertir Churn en booléen NumPy
+    churn = df["Churn"]
+    if pd.api.types.is_bool_dtype(churn) or pd.api.types.is_numeric_dtype(churn):
+        has_churned = churn.to_numpy().astype(bool)
     else:
-        df_work["has_churned"] = df_work["Churn"].astype(bool)
-
-    # --- Insight 1: Churn by Contract ---
-    for contract, group in df_work.groupby("Contract"):
-        insights.append({
-            "insight_name": "churn_by_contract",
-            "dimension": "Contract",
-            "category": str(contract),
-            "total_customers": len(group),
-            "churned_customers": int(group["has_churned"].sum()),
-            "churn_rate": round(group["has_churned"].mean() * 100, 2),
-            "avg_monthly_charges": round(group["MonthlyCharges"].mean(), 2),
-            "avg_tenure": round(group["tenure"].mean(), 1),
-            "avg_total_charges": round(group["TotalCharges"].mean(), 2),
-            "data_source": source,
-        })
-
-    # --- Insight 2: Churn by Internet Service ---
-    for internet, group in df_work.groupby("InternetService"):
-        insights.append({
-            "insight_name": "churn_by_internet",
-            "dimension": "InternetService",
-            "category": str(internet),
-            "total_customers": len(group),
-            "churned_customers": int(group["has_churned"].sum()),
-            "churn_rate": round(group["has_churned"].mean() * 100, 2),
-            "avg_monthly_charges": round(group["MonthlyCharges"].mean(), 2),
-            "avg_tenure": round(group["tenure"].mean(), 1),
-            "avg_total_charges": round(group["TotalCharges"].mean(), 2),
-            "data_source": source,
-        })
-
-    # --- Insight 3: Churn by Payment Method ---
-    for payment, group in df_work.groupby("PaymentMethod"):
-        insights.append({
-            "insight_name": "churn_by_payment",
-            "dimension": "PaymentMethod",
-            "category": str(payment),
-            "total_customers": len(group),
-            "churned_customers": int(group["has_churned"].sum()),
-            "churn_rate": round(group["has_churned"].mean() * 100, 2),
-            "avg_monthly_charges": round(group["MonthlyCharges"].mean(), 2),
-            "avg_tenure": round(group["tenure"].mean(), 1),
-            "avg_total_charges": round(group["TotalCharges"].mean(), 2),
-            "data_source": source,
-        })
+        has_churned = (churn == "Yes").to_numpy(dtype=bool)
+
+    # Indicateurs extraits une seule fois en tableaux NumPy, réutilisés par chaque dimension
+    # (colonnes de "values": MonthlyCharges, tenure, TotalCharges)
+    measures = {
+        "has_churned": has_churned,
+        "values": np.column_stack([
+            df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            for col in ["MonthlyCharges", "tenure", "TotalCharges"]
+        ]),
+    }
+
+    insights = [
+        # --- Insight 1: Churn by Contract ---
+        _agg_insight(df["Contract"], measures, "churn_by_contract", source),
+        # --- Insight 2: Churn by Internet Service ---
+        _agg_insight(df["InternetService"], measures, "churn_by_internet", source),
+        # --- Insight 3: Churn by Payment Method ---
+        _agg_insight(df["PaymentMethod"], measures, "churn_by_payment", source),
+    ]
 
     # --- Insight 4: Churn by Tenure Group ---
-    if "tenure_group" in df_work.columns:
-        for tgroup, group in df_work.groupby("tenure_group"):
-            insights.append({
-                "insight_name": "churn_by_tenure_group",
-                "dimension": "tenure_group",
-                "category": str(tgroup),
-                "total_customers": len(group),
-                "churned_customers": int(group["has_churned"].sum()),
-                "churn_rate": round(group["has_churned"].mean() * 100, 2),
-                "avg_monthly_charges": round(group["MonthlyCharges"].mean(), 2),
-                "avg_tenure": round(group["tenure"].mean(), 1),
-                "avg_total_charges": round(group["TotalCharges"].mean(), 2),
-                "data_source": source,
-            })
+    if "tenure_group" in df.columns:
+        insights.append(_agg_insight(df["tenure_group"], measures, "churn_by_tenure_group", source))
 
     # --- Insight 5: Churn by Gender ---
-    for gender, group in df_work.groupby("gender"):
-        insights.append({
-            "insight_name": "churn_by_gender",
-            "dimension": "gender",
-            "category": str(gender),
-            "total_customers": len(group),
-            "churned_customers": int(group["has_churned"].sum()),
-            "churn_rate": round(group["has_churned"].mean() * 100, 2),
-            "avg_monthly_charges": round(group["MonthlyCharges"].mean(), 2),
-            "avg_tenure": round(group["tenure"].mean(), 1),
-            "avg_total_charges": round(group["TotalCharges"].mean(), 2),
-            "data_source": source,
-        })
+    insights.append(_agg_insight(df["gender"], measures, "churn_by_gender", source))
 
     # --- Insight 6: Churn by Senior Citizen ---
-    for senior, group in df_work.groupby("SeniorCitizen"):
-        insights.append({
-            "insight_name": "churn_by_senior",
-            "dimension": "SeniorCitizen",
-            "category": "Senior" if senior == 1 else "Non-Senior",
-            "total_customers": len(group),
-            "churned_customers": int(group["has_churned"].sum()),
-            "churn_rate": round(group["has_churned"].mean() * 100, 2),
-            "avg_monthly_charges": round(group["MonthlyCharges"].mean(), 2),
-            "avg_tenure": round(group["tenure"].mean(), 1),
-            "avg_total_charges": round(group["TotalCharges"].mean(), 2),
-            "data_source": source,
-        })
+    senior = _agg_insight(df["SeniorCitizen"], measures, "churn_by_senior", source)
+    senior["category"] = np.where(senior["category"] == "1", "Senior", "Non-Senior")
+    insights.append(senior)
 
     # --- Insight 7: Churn by Monthly Charges Group ---
-    if "monthly_charges_group" in df_work.columns:
-        for mgroup, group in df_work.groupby("monthly_charges_group"):
-            insights.append({
-                "insight_name": "churn_by_charges_group",
-                "dimension": "monthly_charges_group",
-                "category": str(mgroup),
-                "total_customers": len(group),
-                "churned_customers": int(group["has_churned"].sum()),
-                "churn_rate": round(group["has_churned"].mean() * 100, 2),
-                "avg_monthly_charges": round(group["MonthlyCharges"].mean(), 2),
-                "avg_tenure": round(group["tenure"].mean(), 1),
-                "avg_total_charges": round(group["TotalCharges"].mean(), 2),
-                "data_source": source,
-            })
-
-    # --- Insight 8: Overall Summary ---
-    insights.append({
-        "insight_name": "overall_summary",
-        "dimension": "ALL",
-        "category": "Total",
-        "total_customers": len(df_work),
-        "churned_customers": int(df_work["has_churned"].sum()),
-        "churn_rate": round(df_work["has_churned"].mean() * 100, 2),
-        "avg_monthly_charges": round(df_work["MonthlyCharges"].mean(), 2),
-        "avg_tenure": round(df_work["tenure"].mean(), 1),
-        "avg_total_charges": round(df_work["TotalCharges"].mean(), 2),
-        "data_source": source,
-    })
+    if "monthly_charges_group" in df.columns:
+        insights.append(_agg_insight(df["monthly_charges_group"], measures, "churn_by_charges_group", source))
+
+    # --- Insight 8: Overall Summary (un seul groupe: toutes les lignes) ---
+    insights.append(_insight_frame(
+        np.zeros(len(has_churned), dtype=np.intp), ["Total"], measures,
+        "overall_summary", "ALL", source,
+    ))
 
-    df_insights = pd.DataFrame(insights)
+    df_insights = pd.concat(insights, ignore_index=True)
 
     print(f"  ✅ {len(df_insights)} insights créés")
-    print(f"  📊 Types d'insights: {df_insights['insight_name'].unique().tolist()}")
+    print(f"  📊 Types d'insights: {[frame['insight_name'].iat[0] for frame in insights if len(frame)]}")
 
     return df_insights
@@ -9,10 +9,56 @@ Transformations appliquées:
     5. Création de la table de faits (Fact Churn)
 """
 
+import re
 import pandas as pd
 import numpy as np
 
 
+# Colonnes Yes/No standardisées (category Yes/No)
+YESNO_COLS = ["Partner", "Dependents", "PhoneService", "PaperlessBilling", "Churn"]
+
+# Autres colonnes converties en category à la fin du nettoyage
+LOW_CARDINALITY_COLS = ["Contract", "InternetService", "PaymentMethod", "gender"]
+
+# Types entiers réduits appliqués à la fin du nettoyage (tenure en mois, SeniorCitizen 0/1).
+# Les charges restent en float64: en float32 (~7 chiffres significatifs), un
+# TotalCharges ≥ 10 000 $ perdrait ses centimes.
+NUMERIC_DOWNCAST = {
+    "tenure": np.int16,
+    "SeniorCitizen": np.int8,
+}
+
+# Premier montant d'un champ de charges: "29.85", "+5", "$ 29.85", "29.85 $", "$29.85$30.10..."
+_AMOUNT_RE = re.compile(r"^[\s$]*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(?:\$|$)")
+
+# Normalisation des colonnes Yes/No (valeurs comparées après strip + lower;
+# booléens et numériques du JSON: True → "true", 1.0 → "1.0")
+_YESNO_MAP = {
+    "yes": "Yes", "true": "Yes", "1": "Yes", "1.0": "Yes",
+    "no": "No", "false": "No", "0": "No", "0.0": "No",
+}
+
+
+def _parse_charges(series: pd.Series) -> pd.Series:
+    """
+    Convertit un champ de charges en numérique (valeurs vides ou invalides → NaN).
+
+    Les valeurs corrompues "$xx.xx$xx.xx..." gardent leur premier montant.
+    """
+    values = series.astype("string").str.strip()
+    amounts = values.str.extract(_AMOUNT_RE, expand=False)
+    parsed = pd.to_numeric(amounts, errors="coerce").astype("float64")
+    invalid = int((parsed.isna() & values.fillna("").ne("")).sum())
+    if invalid:
+        print(f"  ⚠️  {series.name}: {invalid} valeurs non vides invalides → NaN")
+    return parsed
+
+
+def _yes_bool(series: pd.Series) -> np.ndarray:
+    """Colonne Yes/No → tableau booléen NumPy (toute autre valeur → False)."""
+    return (series == "Yes").to_numpy(dtype=bool)
+
+
 def clean_data(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
     """
     Nettoie et standardise les données brutes.
@@ -22,35 +68,20 @@ def clean_data(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
         - Standardiser SeniorCitizen en 0/1
         - Supprimer les doublons
         - Gérer les valeurs manquantes
+        - Convertir les colonnes à faible cardinalité en category
+        - Réduire les types entiers (int16 / int8)
     """
     print(f"\n🔄 TRANSFORM: Nettoyage des données ({source})")
 
-    df_clean = df.copy()
+    # Copie superficielle: chaque colonne modifiée est réassignée (nouveau tableau),
+    # les autres restent partagées avec le DataFrame d'entrée, qui n'est pas modifié.
+    df_clean = df.copy(deep=False)
 
     # 1. Nettoyer TotalCharges (gestion des valeurs corrompues "$xx$xx...")
-    def _parse_total_charges(val):
-        """Extrait la première valeur numérique d'un champ TotalCharges potentiellement corrompu."""
-        if pd.isna(val) or val == "" or val == " ":
-            return np.nan
-        s = str(val).strip()
-        # Si c'est déjà un nombre propre
-        try:
-            return float(s)
-        except ValueError:
-            pass
-        # Extraire le premier montant d'une chaîne "$xx.xx$xx.xx..."
-        s = s.lstrip("$")
-        if "$" in s:
-            s = s.split("$")[0]
-        try:
-            return float(s)
-        except ValueError:
-            return np.nan
-
-    df_clean["TotalCharges"] = df_clean["TotalCharges"].apply(_parse_total_charges)
+    df_clean["TotalCharges"] = _parse_charges(df_clean["TotalCharges"])
 
     # 2. Nettoyer MonthlyCharges (gestion des valeurs avec "$")
-    df_clean["MonthlyCharges"] = df_clean["MonthlyCharges"].apply(_parse_total_charges)
+    df_clean["MonthlyCharges"] = _parse_charges(df_clean["MonthlyCharges"])
 
     # 3. Convertir tenure en numérique
     df_clean["tenure"] = pd.to_numeric(df_clean["tenure"], errors="coerce").fillna(0).astype(int)
@@ -75,21 +106,32 @@ def clean_data(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
     if len(df_clean) < initial_len:
         print(f"  🗑️  {initial_len - len(df_clean)} doublons supprimés")
 
-    # 6. Standardiser les valeurs Yes/No (gestion booléens, NaN, variations de casse)
-    for col in ["Partner", "Dependents", "PhoneService", "PaperlessBilling", "Churn"]:
+    # 6. Standardiser les valeurs Yes/No (gestion booléens, numériques, NaN, variations de casse)
+    #    Valeur non reconnue conservée (capitalisée), valeur manquante → "No"
+    for col in YESNO_COLS:
         if col in df_clean.columns:
-            df_clean[col] = df_clean[col].apply(
-                lambda x: "Yes" if str(x).strip().lower() in ["yes", "true", "1"]
-                else ("No" if str(x).strip().lower() in ["no", "false", "0"]
-                      else str(x).strip().capitalize() if pd.notna(x) else "No")
-            )
+            values = df_clean[col].astype("string").str.strip()
+            standardized = values.str.lower().map(_YESNO_MAP)
+            unmapped = standardized.isna() & values.notna()
+            if unmapped.any():
+                print(f"  ⚠️  {col}: {int(unmapped.sum())} valeurs non reconnues conservées")
+                standardized = standardized.fillna(values.str.capitalize())
+            df_clean[col] = standardized.fillna("No").astype("category")
 
     # 6. Standardiser le genre
     if "gender" in df_clean.columns:
         df_clean["gender"] = df_clean["gender"].str.strip().str.capitalize()
 
+    # 7. Colonnes à faible cardinalité → category (codes entiers, agrégations sans hachage de chaînes)
+    for col in LOW_CARDINALITY_COLS:
+        if col in df_clean.columns:
+            df_clean[col] = df_clean[col].astype("category")
+
+    # 8. Réduire les types entiers (moins d'octets lus par les agrégations)
+    df_clean = df_clean.astype(NUMERIC_DOWNCAST)
+
     print(f"  ✅ {len(df_clean)} lignes après nettoyage")
-    print(f"  📊 Valeurs manquantes restantes: {df_clean.isnull().sum().sum()}")
+    print(f"  📊 Valeurs manquantes restantes: {int(df_clean.isna().to_numpy().sum())}")
 
     return df_clean
 
@@ -107,8 +149,8 @@ def create_dim_customer(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
         "customer_id": df["customerID"],
         "gender": df["gender"],
         "is_senior_citizen": df["SeniorCitizen"].astype(bool),
-        "has_partner": df["Partner"].map({"Yes": True, "No": False}),
-        "has_dependents": df["Dependents"].map({"Yes": True, "No": False}),
+        "has_partner": _yes_bool(df["Partner"]),
+        "has_dependents": _yes_bool(df["Dependents"]),
         "data_source": source,
     })
 
@@ -127,17 +169,18 @@ def create_dim_service(df: pd.DataFrame) -> pd.DataFrame:
     """
     print("\n🔄 TRANSFORM: Création dim_service")
 
+    # Construit depuis les tableaux sous-jacents (Categorical conservés, sans réalignement d'index)
     dim_service = pd.DataFrame({
-        "customer_id": df["customerID"],
-        "phone_service": df["PhoneService"].map({"Yes": True, "No": False}),
-        "multiple_lines": df["MultipleLines"],
-        "internet_service": df["InternetService"],
-        "online_security": df["OnlineSecurity"],
-        "online_backup": df["OnlineBackup"],
-        "device_protection": df["DeviceProtection"],
-        "tech_support": df["TechSupport"],
-        "streaming_tv": df["StreamingTV"],
-        "streaming_movies": df["StreamingMovies"],
+        "customer_id": df["customerID"].array,
+        "phone_service": _yes_bool(df["PhoneService"]),
+        "multiple_lines": df["MultipleLines"].array,
+        "internet_service": df["InternetService"].array,
+        "online_security": df["OnlineSecurity"].array,
+        "online_backup": df["OnlineBackup"].array,
+        "device_protection": df["DeviceProtection"].array,
+        "tech_support": df["TechSupport"].array,
+        "streaming_tv": df["StreamingTV"].array,
+        "streaming_movies": df["StreamingMovies"].array,
     })
 
     print(f"  ✅ {len(dim_service)} services créés")
@@ -156,7 +199,7 @@ def create_dim_contract(df: pd.DataFrame) -> pd.DataFrame:
     dim_contract = pd.DataFrame({
         "customer_id": df["customerID"],
         "contract_type": df["Contract"],
-        "paperless_billing": df["PaperlessBilling"].map({"Yes": True, "No": False}),
+        "paperless_billing": _yes_bool(df["PaperlessBilling"]),
         "payment_method": df["PaymentMethod"],
     })
 
@@ -178,7 +221,7 @@ def create_fact_churn(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
         "tenure_months": df["tenure"],
         "monthly_charges": df["MonthlyCharges"],
         "total_charges": df["TotalCharges"],
-        "has_churned": df["Churn"].map({"Yes": True, "No": False}),
+        "has_churned": _yes_bool(df["Churn"]),
         "customer_feedback": df.get("CustomerFeedback", pd.Series(dtype=str)),
         "data_source": source,
     })
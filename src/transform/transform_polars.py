@@ -0,0 +1,191 @@
+"""
+Transform Polars - Features et insights Telco Churn avec Polars (LazyFrame)
+
+Même API et mêmes résultats que src.transform.create_insights:
+    - add_engineered_features(df)          → DataFrame pandas
+    - create_churn_insights(df, source)    → DataFrame pandas
+
+L'entrée peut être un DataFrame pandas ou une table Arrow (lue sans copie
+par Polars). Les expressions sont exécutées par le moteur Polars
+multi-threadé; les insights de toutes les dimensions forment un seul plan
+lazy, collecté une fois.
+"""
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+
+TENURE_BINS = [0, 12, 24, 48, 60, 100]
+TENURE_LABELS = ["0-12 mois", "13-24 mois", "25-48 mois", "49-60 mois", "61+ mois"]
+
+CHARGES_BINS = [0, 30, 50, 70, 90, 200]
+CHARGES_LABELS = ["0-30$", "31-50$", "51-70$", "71-90$", "91+$"]
+
+SERVICE_COLS = ["PhoneService", "MultipleLines", "InternetService",
+                "OnlineSecurity", "OnlineBackup", "DeviceProtection",
+                "TechSupport", "StreamingTV", "StreamingMovies"]
+
+CONTRACT_RISK = {
+    "Month-to-month": 3,
+    "One year": 2,
+    "Two year": 1
+}
+
+# (colonne dimension, nom de l'insight), dans l'ordre de create_insights
+INSIGHT_DIMENSIONS = [
+    ("Contract", "churn_by_contract"),
+    ("InternetService", "churn_by_internet"),
+    ("PaymentMethod", "churn_by_payment"),
+    ("tenure_group", "churn_by_tenure_group"),
+    ("gender", "churn_by_gender"),
+    ("SeniorCitizen", "churn_by_senior"),
+    ("monthly_charges_group", "churn_by_charges_group"),
+]
+
+
+def _to_lazy(data) -> pl.LazyFrame:
+    """DataFrame pandas ou table Arrow → LazyFrame Polars."""
+    if isinstance(data, pa.Table):
+        return pl.from_arrow(data).lazy()
+    return pl.from_pandas(data).lazy()
+
+
+def _cut(column: str, bins: list, labels: list) -> pl.Expr:
+    """Équivalent de pd.cut(include_lowest=True): intervalles fermés à droite, hors bornes → null."""
+    values = pl.col(column)
+    return (
+        pl.when(values.is_between(bins[0], bins[-1]))
+        .then(values.cut(bins[1:-1], labels=labels).cast(pl.String))
+        .cast(pl.Enum(labels))
+    )
+
+
+def _is_in(columns: list, values: list) -> list:
+    """Une expression booléenne par colonne (valeur manquante → False)."""
+    return [pl.col(col).cast(pl.String).is_in(values).fill_null(False) for col in columns]
+
+
+def add_engineered_features(df) -> pd.DataFrame:
+    """
+    Ajoute les features engineerées (voir create_insights.add_engineered_features).
+    """
+    print("\n🔄 TRANSFORM: Ajout de features engineerées (Polars)")
+
+    lf = _to_lazy(df)
+    columns = lf.collect_schema().names()
+
+    def _present(cols):
+        return [col for col in cols if col in columns]
+
+    streaming = _present(["StreamingTV", "StreamingMovies"])
+    security = _present(["OnlineSecurity", "OnlineBackup", "DeviceProtection"])
+    services = _present(SERVICE_COLS)
+
+    lf = lf.with_columns(
+        # 1. Tenure Group / 2. Monthly Charges Group
+        _cut("tenure", TENURE_BINS, TENURE_LABELS).alias("tenure_group"),
+        _cut("MonthlyCharges", CHARGES_BINS, CHARGES_LABELS).alias("monthly_charges_group"),
+        # 3. Total Services Count
+        (
+            pl.sum_horizontal(_is_in(services, ["Yes", "DSL", "Fiber optic"])).cast(pl.Int8)
+            if services else pl.lit(0, dtype=pl.Int8)
+        ).alias("total_services"),
+        # 4. Has Streaming / 5. Has Security Bundle (colonnes absentes = "No")
+        (pl.any_horizontal(_is_in(streaming, ["Yes"])) if streaming else pl.lit(False)).alias("has_streaming"),
+        (pl.any_horizontal(_is_in(security, ["Yes"])) if security else pl.lit(False)).alias("has_security"),
+        # 6. Is High Value
+        (pl.col("MonthlyCharges") > pl.col("MonthlyCharges").median()).fill_null(False).alias("is_high_value"),
+        # 7. Average Monthly Spend
+        pl.when(pl.col("tenure") > 0)
+        .then(pl.col("TotalCharges") / pl.col("tenure"))
+        .otherwise(pl.col("MonthlyCharges"))
+        .alias("avg_monthly_spend"),
+        # 8. Contract Risk Score (Month-to-month = high risk)
+        pl.col("Contract").cast(pl.String)
+        .replace_strict(CONTRACT_RISK, default=2, return_dtype=pl.Int8)
+        .fill_null(2)
+        .alias("contract_risk_score"),
+    )
+
+    df_feat = lf.collect().to_pandas()
+
+    print(f"  ✅ {len(df_feat)} lignes avec {len(df_feat.columns)} features")
+    print(f"  📊 Nouvelles features: tenure_group, monthly_charges_group, total_services,")
+    print(f"     has_streaming, has_security, is_high_value, avg_monthly_spend, contract_risk_score")
+
+    return df_feat
+
+
+def _insight_metrics() -> list:
+    """Indicateurs d'un insight, calculés sur un groupe (ou sur toutes les lignes)."""
+    return [
+        pl.len().cast(pl.Int64).alias("total_customers"),
+        pl.col("has_churned").sum().cast(pl.Int64).alias("churned_customers"),
+        (pl.col("has_churned").mean() * 100).round(2).cast(pl.Float32).alias("churn_rate"),
+        pl.col("MonthlyCharges").cast(pl.Float64).mean().round(2).alias("avg_monthly_charges"),
+        pl.col("tenure").cast(pl.Float64).mean().round(1).alias("avg_tenure"),
+        pl.col("TotalCharges").cast(pl.Float64).mean().round(2).alias("avg_total_charges"),
+    ]
+
+
+def _agg_insight(lf: pl.LazyFrame, col: str, insight_name: str, source: str) -> pl.LazyFrame:
+    """Une ligne d'insight par catégorie de `col` (clés manquantes ignorées, comme groupby)."""
+    if col == "SeniorCitizen":
+        category = pl.when(pl.col(col) == 1).then(pl.lit("Senior")).otherwise(pl.lit("Non-Senior"))
+    else:
+        category = pl.col(col).cast(pl.String)
+
+    return (
+        lf.drop_nulls(col)
+        .group_by(col)
+        .agg(_insight_metrics())
+        .sort(col)
+        .select(
+            pl.lit(insight_name).alias("insight_name"),
+            pl.lit(col).alias("dimension"),
+            category.alias("category"),
+            pl.exclude(col),
+            pl.lit(source).alias("data_source"),
+        )
+    )
+
+
+def create_churn_insights(df, source: str = "csv") -> pd.DataFrame:
+    """
+    Crée la table d'insights agrégés pour Grafana (voir create_insights.create_churn_insights).
+    """
+    print(f"\n🔄 TRANSFORM: Création des insights ({source}, Polars)")
+
+    lf = _to_lazy(df)
+    schema = lf.collect_schema()
+
+    # Convertir Churn en booléen
+    churn_type = schema["Churn"]
+    if churn_type == pl.Boolean or churn_type.is_numeric():
+        has_churned = pl.col("Churn").cast(pl.Boolean)
+    else:
+        has_churned = (pl.col("Churn").cast(pl.String) == "Yes").fill_null(False)
+    lf = lf.with_columns(has_churned.alias("has_churned"))
+
+    insights = [
+        _agg_insight(lf, col, insight_name, source)
+        for col, insight_name in INSIGHT_DIMENSIONS
+        if col in schema
+    ]
+
+    # --- Overall Summary ---
+    insights.append(lf.select(
+        pl.lit("overall_summary").alias("insight_name"),
+        pl.lit("ALL").alias("dimension"),
+        pl.lit("Total").alias("category"),
+        *_insight_metrics(),
+        pl.lit(source).alias("data_source"),
+    ))
+
+    df_insights = pl.concat(insights).collect().to_pandas()
+
+    print(f"  ✅ {len(df_insights)} insights créés")
+    print(f"  📊 Types d'insights: {df_insights['insight_name'].unique().tolist()}")
+
+    return df_insights
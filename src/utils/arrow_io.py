@@ -0,0 +1,73 @@
+"""
+Arrow IO Utility
+Sérialisation des DataFrames intermédiaires entre les tasks Airflow.
+
+Les DataFrames échangés entre tasks (via ArrowXComBackend) sont stockés au
+format Arrow IPC (Feather v2) non compressé: la relecture se fait par
+memory-map, sans décodage Parquet.
+"""
+
+import pandas as pd
+import pyarrow as pa
+
+
+def _column_to_arrow(series: pd.Series) -> pa.Array:
+    """Convertit une colonne pandas; une colonne object de types mixtes devient string."""
+    try:
+        return pa.array(series, from_pandas=True, safe=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(series.map(str, na_action="ignore"), type=pa.string(), from_pandas=True)
+
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Convertit un DataFrame pandas en table Arrow.
+
+    Les colonnes object aux types mixtes (ex: JSON avec 1 et "1") sont
+    unifiées en string, les valeurs manquantes restant NULL; les autres
+    colonnes gardent leur type inféré.
+    """
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False, safe=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.table({col: _column_to_arrow(df[col]) for col in df.columns})
+
+
+def write_ipc(data, path: str) -> str:
+    """Écrit un DataFrame pandas (ou une table Arrow) dans un fichier Arrow IPC et retourne son chemin."""
+    table = data if isinstance(data, pa.Table) else to_arrow_table(data)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def read_ipc_table(path: str) -> pa.Table:
+    """
+    Ouvre un fichier Arrow IPC en memory-map et retourne la table Arrow.
+
+    Aucune conversion pandas: les pages ne sont chargées qu'à la lecture,
+    ce qui permet de streamer la table par lots (ex: COPY PostgreSQL).
+    """
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _is_string_type(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+
+def to_pandas_dictionary(table: pa.Table, columns: list) -> pd.DataFrame:
+    """
+    Convertit une table Arrow en pandas en un seul bloc par colonne.
+
+    Les colonnes string listées (faible cardinalité: Contract, gender...)
+    sont encodées en dictionnaire et deviennent des Categorical pandas:
+    codes entiers + quelques valeurs au lieu d'un tableau d'objets.
+    """
+    table = table.combine_chunks()
+    for col in columns:
+        if col in table.column_names and _is_string_type(table.schema.field(col).type):
+            index = table.column_names.index(col)
+            table = table.set_column(index, col, table[col].dictionary_encode())
+    return table.to_pandas()
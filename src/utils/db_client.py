@@ -10,44 +10,223 @@ Configuration via variables d'environnement:
     PG_PASSWORD: Mot de passe         (default: telco_pass)
 """
 
+import io
 import os
-import psycopg2
-import pandas as pd
-
-
-def get_db_connection():
-    """Crée et retourne une connexion PostgreSQL."""
-    conn = psycopg2.connect(
-        host=os.getenv("PG_HOST", "localhost"),
-        port=int(os.getenv("PG_PORT", "5433")),
-        database=os.getenv("PG_DATABASE", "telco_warehouse"),
-        user=os.getenv("PG_USER", "telco_admin"),
-        password=os.getenv("PG_PASSWORD", "telco_pass"),
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+import adbc_driver_postgresql.dbapi as adbc_postgresql
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from src.utils.arrow_io import to_arrow_table
+
+
+# En dessous de ce seuil, un INSERT multi-lignes (execute_values) suffit:
+# quelques requêtes de 1000 lignes, sans table temporaire.
+# Au-delà, les lignes passent par COPY FROM STDIN.
+COPY_MIN_ROWS = 5000
+
+# Taille des lots envoyés à COPY (mémoire constante quel que soit le volume)
+COPY_BATCH_ROWS = 50_000
+
+
+def _connection_params() -> dict:
+    """Paramètres de connexion PostgreSQL depuis les variables d'environnement."""
+    return {
+        "host": os.getenv("PG_HOST", "localhost"),
+        "port": int(os.getenv("PG_PORT", "5433")),
+        "database": os.getenv("PG_DATABASE", "telco_warehouse"),
+        "user": os.getenv("PG_USER", "telco_admin"),
+        "password": os.getenv("PG_PASSWORD", "telco_pass"),
+    }
+
+
+def get_adbc_connection():
+    """Crée et retourne une connexion ADBC PostgreSQL (ingestion Arrow native)."""
+    params = _connection_params()
+    uri = (
+        f"postgresql://{quote(params['user'], safe='')}:{quote(params['password'], safe='')}"
+        f"@{params['host']}:{params['port']}/{params['database']}"
     )
-    return conn
+    return adbc_postgresql.connect(uri)
+
+
+def create_connection_pool(min_size: int = 1, max_size: int = 2) -> ThreadedConnectionPool:
+    """Crée un pool de connexions PostgreSQL partageable entre threads."""
+    return ThreadedConnectionPool(min_size, max_size, **_connection_params())
+
+
+# Pool du process courant, indexé par pid: un process forké (worker Airflow)
+# ne réutilise jamais les sockets héritées de son parent.
+_process_pools = {}
+_process_pools_lock = threading.Lock()
+
+
+def get_connection_pool(max_size: int = 2) -> ThreadedConnectionPool:
+    """
+    Retourne le pool de connexions du process (créé au premier appel).
+
+    Deux connexions par défaut: seuls les deux chargements de staging
+    (psycopg2) s'exécutent en parallèle, le warehouse passe par ADBC.
+    """
+    pid = os.getpid()
+    with _process_pools_lock:
+        pool = _process_pools.get(pid)
+        if pool is None or pool.closed:
+            # Pools hérités d'un parent: abandonnés sans les fermer (sockets du parent)
+            _process_pools.clear()
+            pool = _process_pools[pid] = create_connection_pool(1, max_size)
+        return pool
 
 
-def insert_dataframe(conn, table_name: str, df: pd.DataFrame):
-    """Insère un DataFrame pandas dans une table PostgreSQL."""
-    if df.empty:
+@contextmanager
+def db_connection(pool: ThreadedConnectionPool = None):
+    """
+    Fournit une connexion PostgreSQL le temps d'un bloc `with`.
+
+    La connexion est empruntée au pool donné, ou par défaut au pool du
+    process (get_connection_pool), puis rendue au pool: les chargements
+    successifs réutilisent les mêmes connexions.
+    """
+    pool = pool or get_connection_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def insert_dataframe(conn, table_name: str, df):
+    """
+    Insère un DataFrame pandas (ou une table Arrow) dans une table PostgreSQL.
+
+    Les petits volumes passent par un INSERT multi-lignes ... ON CONFLICT DO NOTHING,
+    les gros sont streamés par lots de RecordBatch via COPY FROM STDIN
+    (voir _copy_batches).
+    """
+    if len(df) == 0:
         print(f"  ⚠️  DataFrame vide, rien à insérer dans {table_name}")
         return
 
-    columns = ", ".join(df.columns)
-    placeholders = ", ".join(["%s"] * len(df.columns))
-    values = [tuple(row) for row in df.values]
+    cursor = conn.cursor()
+    try:
+        if len(df) < COPY_MIN_ROWS:
+            _insert_rows(cursor, table_name, df)
+        else:
+            table = df if isinstance(df, pa.Table) else to_arrow_table(df)
+            _copy_batches(
+                cursor, table_name, table.column_names,
+                table.to_batches(max_chunksize=COPY_BATCH_ROWS),
+            )
+        conn.commit()
+        print(f"  ✅ {len(df)} lignes insérées dans {table_name}")
+    except Exception as e:
+        conn.rollback()
+        print(f"  ❌ Erreur insertion dans {table_name}: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def _row_tuples(data) -> list:
+    """
+    Lignes d'un DataFrame pandas ou d'une table Arrow en tuples de scalaires Python.
+
+    Le DataFrame est d'abord converti en table Arrow; les colonnes sont
+    ensuite converties une à une (to_pylist, NULL/NaN → None), sans l'upcast
+    en object de df.values.
+    """
+    table = data if isinstance(data, pa.Table) else to_arrow_table(data)
+    return list(zip(*(column.to_pylist() for column in table.columns)))
+
+
+def _insert_rows(cursor, table_name: str, df):
+    """INSERT multi-lignes (execute_values, 1000 lignes par requête), réservé aux petits volumes."""
+    columns = ", ".join(df.column_names if isinstance(df, pa.Table) else df.columns)
+    values = _row_tuples(df)
 
     query = f"""
         INSERT INTO {table_name} ({columns})
-        VALUES ({placeholders})
+        VALUES %s
         ON CONFLICT DO NOTHING
     """
+    execute_values(cursor, query, values, page_size=1000)
+
+
+def _copy_batches(cursor, table_name: str, column_names: list, batches):
+    """
+    Charge une suite de RecordBatch Arrow via COPY FROM STDIN.
+
+    Chaque lot est sérialisé en CSV par Arrow puis envoyé à COPY: seul le lot
+    courant est matérialisé en mémoire.
+
+    COPY ne supporte pas ON CONFLICT: les lignes sont d'abord copiées dans
+    une table temporaire (mêmes types, sans contraintes), puis fusionnées
+    dans la table cible avec INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    """
+    columns = ", ".join(column_names)
+    temp_table = "tmp_" + table_name.replace(".", "_")
+
+    cursor.execute(f"""
+        CREATE TEMP TABLE {temp_table} ON COMMIT DROP AS
+        SELECT {columns} FROM {table_name} WITH NO DATA
+    """)
+
+    # CSV Arrow: NULL = champ vide non quoté, chaîne vide = "" (défauts de COPY CSV)
+    write_options = pacsv.WriteOptions(include_header=False)
+    for batch in batches:
+        buffer = io.BytesIO()
+        pacsv.write_csv(batch, buffer, write_options)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {temp_table} ({columns}) FROM STDIN WITH (FORMAT CSV)", buffer)
+
+    cursor.execute(f"""
+        INSERT INTO {table_name} ({columns})
+        SELECT {columns} FROM {temp_table}
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def _decode_dictionaries(table: pa.Table) -> pa.Table:
+    """Redécode les colonnes dictionnaire (Categorical pandas) vers leur type de valeurs."""
+    for index, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(index, field.name, table[field.name].cast(field.type.value_type))
+    return table
+
+
+def ingest_arrow(conn, table_name: str, data):
+    """
+    Insère une table Arrow (ou un DataFrame pandas) via une connexion ADBC.
+
+    Le driver ADBC envoie les colonnes Arrow en COPY binaire, sans passer
+    par des tuples Python ni par une sérialisation CSV. Comme pour
+    _copy_batches, les lignes sont ingérées dans une table temporaire puis
+    fusionnées avec INSERT ... SELECT ... ON CONFLICT DO NOTHING, ce qui
+    garde un chargement rejouable (clés uniques des dimensions).
+    """
+    if len(data) == 0:
+        print(f"  ⚠️  DataFrame vide, rien à insérer dans {table_name}")
+        return
+
+    table = data if isinstance(data, pa.Table) else to_arrow_table(data)
+    table = _decode_dictionaries(table)
+    columns = ", ".join(table.column_names)
+    temp_table = "tmp_" + table_name.replace(".", "_")
 
     cursor = conn.cursor()
     try:
-        cursor.executemany(query, values)
+        cursor.adbc_ingest(temp_table, table, mode="create", temporary=True)
+        cursor.execute(f"""
+            INSERT INTO {table_name} ({columns})
+            SELECT {columns} FROM {temp_table}
+            ON CONFLICT DO NOTHING
+        """)
+        cursor.execute(f"DROP TABLE {temp_table}")
         conn.commit()
-        print(f"  ✅ {len(values)} lignes insérées dans {table_name}")
+        print(f"  ✅ {len(table)} lignes insérées dans {table_name}")
     except Exception as e:
         conn.rollback()
         print(f"  ❌ Erreur insertion dans {table_name}: {e}")
@@ -8,7 +8,11 @@ Configuration via variables d'environnement:
     MINIO_SECRET_KEY: Secret key    (default: minioadmin)
 """
 
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 
@@ -21,9 +25,21 @@ BUCKET_MAP = {
     "curated": "telco-curated",
 }
 
+# Téléchargement par plages parallèles au-delà de cette taille
+PARALLEL_GET_MIN_SIZE = 16 * 1024 * 1024
+PARALLEL_GET_PARTS = 8
 
+# Connexions HTTP gardées ouvertes par le client (partagées entre threads:
+# plages parallel_get, uploads concurrents)
+HTTP_POOL_MAXSIZE = 32
+
+# Uploads simultanés de upload_batch
+UPLOAD_BATCH_WORKERS = 8
+
+
+@lru_cache(maxsize=1)
 def load_config() -> dict:
-    """Retourne la configuration MinIO depuis les variables d'environnement."""
+    """Retourne la configuration MinIO depuis les variables d'environnement (lue une fois par process)."""
     return {
         "minio": {
             "endpoint": os.getenv("MINIO_ENDPOINT", "localhost:9000"),
@@ -35,14 +51,26 @@ def load_config() -> dict:
     }
 
 
+@lru_cache(maxsize=1)
 def get_minio_client() -> Minio:
-    """Crée et retourne un client MinIO."""
+    """
+    Retourne le client MinIO du process (créé au premier appel).
+
+    Le client s'appuie sur un seul PoolManager urllib3: les connexions
+    HTTP sont réutilisées d'un appel (et d'un thread) à l'autre.
+    """
     config = load_config()["minio"]
+    http_client = urllib3.PoolManager(
+        maxsize=HTTP_POOL_MAXSIZE,
+        timeout=urllib3.Timeout(connect=10, read=300),
+        retries=urllib3.Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
     return Minio(
         endpoint=config["endpoint"],
         access_key=config["access_key"],
         secret_key=config["secret_key"],
         secure=config["secure"],
+        http_client=http_client,
     )
 
 
@@ -56,12 +84,69 @@ def create_buckets(client: Minio):
             print(f"  ℹ️  Bucket '{bucket_name}' existe déjà ({layer})")
 
 
+@lru_cache(maxsize=1)
+def ensure_buckets():
+    """Crée les buckets si besoin, une seule fois par process (create_buckets en cache)."""
+    create_buckets(get_minio_client())
+
+
+def parallel_get(client: Minio, bucket_name: str, object_name: str, size: int,
+                 n_parts: int = PARALLEL_GET_PARTS) -> bytes:
+    """
+    Télécharge un objet par N requêtes GET de plages concurrentes.
+
+    Chaque plage est écrite à sa position dans le buffer préalloué d'un
+    BytesIO de la taille de l'objet; getvalue() le retourne ensuite en bytes
+    sans copie (réservé aux gros objets, cf. PARALLEL_GET_MIN_SIZE).
+    """
+    buffer = io.BytesIO(bytes(size))
+    part_size = -(-size // n_parts)
+
+    with buffer.getbuffer() as view:
+        def _get_range(offset: int):
+            length = min(part_size, size - offset)
+            response = client.get_object(bucket_name, object_name, offset=offset, length=length)
+            try:
+                view[offset:offset + length] = response.read()
+            finally:
+                response.close()
+                response.release_conn()
+
+        with ThreadPoolExecutor(max_workers=n_parts) as executor:
+            list(executor.map(_get_range, range(0, size, part_size)))
+
+    return buffer.getvalue()
+
+
 def upload_data(client: Minio, bucket_name: str, object_name: str, data, length: int,
-                content_type: str = "application/octet-stream"):
-    """Upload des données (bytes/stream) dans un bucket MinIO."""
+                content_type: str = "application/octet-stream", part_size: int = 0):
+    """
+    Upload des données (bytes/stream) dans un bucket MinIO.
+
+    length=-1 pour un flux de taille inconnue (part_size obligatoire).
+    """
     try:
-        client.put_object(bucket_name, object_name, data, length, content_type=content_type)
+        client.put_object(bucket_name, object_name, data, length,
+                          content_type=content_type, part_size=part_size)
         print(f"  ✅ '{object_name}' uploadé dans '{bucket_name}'")
     except S3Error as e:
         print(f"  ❌ Erreur upload: {e}")
         raise
+
+
+def upload_batch(client: Minio, items, max_workers: int = UPLOAD_BATCH_WORKERS):
+    """
+    Upload concurrent de plusieurs objets dans MinIO.
+
+    items: tuples d'arguments de upload_data
+        (bucket_name, object_name, data, length[, content_type, part_size]).
+    Les threads partagent le pool HTTP du client; la première erreur est relevée
+    une fois tous les uploads terminés.
+    """
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(upload_data, client, *item) for item in items]
+        for future in futures:
+            future.result()
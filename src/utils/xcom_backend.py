@@ -0,0 +1,120 @@
+"""
+Arrow XCom Backend
+Backend XCom Airflow qui persiste les DataFrames / tables Arrow en Arrow IPC.
+
+Activation (docker-compose):
+    AIRFLOW__CORE__XCOM_BACKEND=src.utils.xcom_backend.ArrowXComBackend
+
+Configuration via variables d'environnement:
+    ARROW_XCOM_DIR: Répertoire des fichiers XCom (default: /tmp), à placer sur
+                    un volume partagé par les conteneurs Airflow
+    ARROW_XCOM_RETENTION_DAYS: Âge max. des fichiers XCom orphelins (default: 7)
+
+Seul le chemin du fichier est stocké dans la base Airflow; la task suivante
+reçoit une table Arrow memory-mappée (conversion pandas à sa charge).
+Les autres valeurs passent par la sérialisation XCom standard.
+
+Le fichier est supprimé avec son XCom (purge, ex: clear d'une task); les
+fichiers plus anciens que la rétention (runs supprimés de la base) sont
+nettoyés à chaque écriture.
+"""
+
+import os
+import re
+import time
+import pandas as pd
+import pyarrow as pa
+from airflow.models.xcom import BaseXCom
+from src.utils.arrow_io import write_ipc, read_ipc_table
+
+
+ARROW_XCOM_PREFIX = "arrow-ipc://"
+
+
+def _xcom_path(dag_id: str, run_id: str, task_id: str, key: str, map_index) -> str:
+    """Chemin du fichier IPC d'une XCom (caractères hors [A-Za-z0-9_.-] remplacés)."""
+    name = "_".join(str(part) for part in (dag_id, run_id, task_id, key, map_index))
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    return os.path.join(_xcom_dir(), f"xcom_{name}.arrow")
+
+
+def _xcom_dir() -> str:
+    return os.getenv("ARROW_XCOM_DIR", "/tmp")
+
+
+def _purge_expired(directory: str):
+    """Supprime les fichiers xcom_*.arrow non modifiés depuis ARROW_XCOM_RETENTION_DAYS jours."""
+    cutoff = time.time() - float(os.getenv("ARROW_XCOM_RETENTION_DAYS", "7")) * 86400
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("xcom_") and entry.name.endswith(".arrow"):
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    # Déjà supprimé par un autre worker
+                    pass
+
+
+def _remove_reference(value):
+    """Supprime le fichier IPC d'une référence (fichier absent ignoré)."""
+    if isinstance(value, str) and value.startswith(ARROW_XCOM_PREFIX):
+        try:
+            os.remove(value[len(ARROW_XCOM_PREFIX):])
+        except FileNotFoundError:
+            pass
+
+
+def _to_reference(value, path: str, reuse: bool = False):
+    """Écrit une table en IPC (sauf fichier déjà présent si reuse) et retourne sa référence."""
+    if not (reuse and os.path.exists(path)):
+        write_ipc(value, path)
+    return ARROW_XCOM_PREFIX + path
+
+
+def _from_reference(value):
+    """Relit une référence IPC en table Arrow; les autres valeurs sont retournées telles quelles."""
+    if isinstance(value, str) and value.startswith(ARROW_XCOM_PREFIX):
+        return read_ipc_table(value[len(ARROW_XCOM_PREFIX):])
+    return value
+
+
+class ArrowXComBackend(BaseXCom):
+    """XCom backend: DataFrame / pa.Table → fichier Arrow IPC, relu en memory-map."""
+
+    @staticmethod
+    def serialize_value(value, *, key=None, task_id=None, dag_id=None, run_id=None, map_index=None, **kwargs):
+        if isinstance(value, (pd.DataFrame, pa.Table, dict)):
+            _purge_expired(_xcom_dir())
+
+        if isinstance(value, (pd.DataFrame, pa.Table)):
+            value = _to_reference(value, _xcom_path(dag_id, run_id, task_id, key, map_index))
+        elif isinstance(value, dict):
+            # multiple_outputs: chaque clé a déjà été poussée (et écrite) avant le
+            # dict complet "return_value", qui réutilise donc les mêmes fichiers.
+            value = {
+                item_key: _to_reference(item, _xcom_path(dag_id, run_id, task_id, item_key, map_index), reuse=True)
+                if isinstance(item, (pd.DataFrame, pa.Table)) else item
+                for item_key, item in value.items()
+            }
+        return BaseXCom.serialize_value(
+            value, key=key, task_id=task_id, dag_id=dag_id, run_id=run_id, map_index=map_index,
+        )
+
+    @staticmethod
+    def deserialize_value(result):
+        value = BaseXCom.deserialize_value(result)
+        if isinstance(value, dict):
+            return {item_key: _from_reference(item) for item_key, item in value.items()}
+        return _from_reference(value)
+
+    @staticmethod
+    def purge(xcom, session):
+        # Valeur brute (référence), sans relire le fichier IPC. Chargée par l'ORM
+        # (XCom.clear), init_on_load l'a déjà décodée: seuls les bytes restent à décoder.
+        value = xcom.value
+        if isinstance(value, bytes):
+            value = BaseXCom._deserialize_value(xcom, True)
+        items = value.values() if isinstance(value, dict) else [value]
+        for item in items:
+            _remove_reference(item)
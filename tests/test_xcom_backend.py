@@ -0,0 +1,84 @@
+"""
+Tests ArrowXComBackend: purge des fichiers IPC au clear / re-run d'une task.
+
+Le backend est activé avant l'import d'Airflow (résolu à l'import de airflow.models.xcom),
+sur une base SQLite temporaire.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# AIRFLOW_HOME et base jetables: resetdb() ne doit jamais toucher la base Airflow réelle
+AIRFLOW_HOME = tempfile.mkdtemp(prefix="airflow_home_")
+SQL_ALCHEMY_CONN = f"sqlite:///{os.path.join(AIRFLOW_HOME, 'airflow.db')}"
+os.environ["AIRFLOW_HOME"] = AIRFLOW_HOME
+os.environ["AIRFLOW__DATABASE__SQL_ALCHEMY_CONN"] = SQL_ALCHEMY_CONN
+os.environ["AIRFLOW__CORE__XCOM_BACKEND"] = "src.utils.xcom_backend.ArrowXComBackend"
+os.environ["AIRFLOW__CORE__LOAD_EXAMPLES"] = "False"
+os.environ["AIRFLOW__CORE__UNIT_TEST_MODE"] = "True"
+
+# Racine du repo pour les imports src.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip("airflow")
+pd = pytest.importorskip("pandas")
+
+from airflow import settings
+from airflow.decorators import dag, task
+from airflow.models.xcom import XCom
+from airflow.utils import db
+from airflow.utils.state import TaskInstanceState
+
+
+DAG_ID = "test_arrow_xcom_purge"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def airflow_db():
+    assert settings.SQL_ALCHEMY_CONN == SQL_ALCHEMY_CONN
+    db.resetdb()
+
+
+@pytest.fixture
+def xcom_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARROW_XCOM_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _build_dag():
+    @dag(dag_id=DAG_ID, start_date=datetime(2024, 1, 1), schedule=None, catchup=False)
+    def arrow_xcom_dag():
+        @task(task_id="produce")
+        def produce():
+            return pd.DataFrame({"customerID": ["a", "b"], "tenure": [1, 2]})
+
+        @task(task_id="consume")
+        def consume(table):
+            assert table.num_rows == 2
+
+        consume(produce())
+
+    return arrow_xcom_dag()
+
+
+def test_clear_and_rerun_purge_ipc_files(xcom_dir):
+    test_dag = _build_dag()
+    dagrun = test_dag.test()
+    files = list(xcom_dir.glob("xcom_*.arrow"))
+    assert len(files) == 1
+
+    # Re-run: clear_xcom_data purge l'XCom existante avant le corps de la task
+    ti = dagrun.get_task_instance("produce")
+    ti.task = test_dag.get_task("produce")
+    ti.run(ignore_ti_state=True)
+    assert ti.state == TaskInstanceState.SUCCESS
+    assert files[0].exists()
+
+    # Clear direct (ex: "Clear" dans l'UI)
+    XCom.clear(dag_id=DAG_ID, task_id="produce", run_id=dagrun.run_id)
+    assert not files[0].exists()
+    assert XCom.get_one(dag_id=DAG_ID, task_id="produce", run_id=dagrun.run_id) is None